@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List
+from typing import List, Callable, Optional
 from sections.base_section import PipelineSection
 
 class SelectionMode(Enum):
@@ -16,6 +16,10 @@ class PipelineCategory:
         self.selection_mode = selection_mode
         self.stage_index = stage_index  # 1=Prep, 2=SfM, etc. (For ordering checks)
         self.sections: List[PipelineSection] = []
+        # Set by the PipelineManager so its section -> category index stays current
+        self.on_section_added: Optional[Callable[['PipelineCategory', PipelineSection], None]] = None
 
     def add_section(self, section: PipelineSection):
         self.sections.append(section)
+        if self.on_section_added:
+            self.on_section_added(self, section)
@@ -1,156 +1,138 @@
 import sys
 import os
-from typing import List, Dict, Any
+import functools
+from typing import List, Callable, TypeVar
+from .state_models import BlurConfig, DedupConfig, ExtractConfig
+from .paths import SCRIPTS_DIR
+
+# Resolve script paths once
+_SCRIPTS = {
+    "blur": os.path.join(SCRIPTS_DIR, "blur_filter.py"),
+    "dedup": os.path.join(SCRIPTS_DIR, "deduplicate.py"),
+    "extract": os.path.join(SCRIPTS_DIR, "extract_frames.py"),
+}
+
+# Invariant command prefixes, copied with list(...) per build
+_BLUR_PREFIX = (sys.executable, _SCRIPTS["blur"])
+_DEDUP_PREFIX = (sys.executable, _SCRIPTS["dedup"])
+_EXTRACT_PREFIX = (sys.executable, _SCRIPTS["extract"])
+
+_Config = TypeVar("_Config")
+
+def _memoized(build: Callable[[_Config], List[str]]) -> Callable[[_Config], List[str]]:
+    """
+    Caches a builder's command per distinct (frozen, hashable) config, so repeated
+    Run presses with unchanged settings skip the argument marshalling.
+    """
+    cached = functools.lru_cache(maxsize=32)(lambda cfg: tuple(build(cfg)))
+
+    @functools.wraps(build)
+    def wrapper(cfg: _Config) -> List[str]:
+        return list(cached(cfg))
+
+    return wrapper
 
 class BlurCommandBuilder:
     @staticmethod
-    def build(config: Dict[str, Any]) -> List[str]:
+    @_memoized
+    def build(cfg: BlurConfig) -> List[str]:
         """
         Builds the command line arguments for the Blur Filter script.
         """
-        # Resolve script path relative to this file
-        # This file is in core/
-        # Scripts are in scripts/
-        # Path: ../scripts/blur_filter.py
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        # base_dir is now the project root
-        script_path = os.path.join(base_dir, "scripts", "blur_filter.py")
-        
-        cmd = [sys.executable, script_path]
+        cmd = list(_BLUR_PREFIX)
         
         # injected paths
-        if "input_dir" in config:
-            cmd.extend(["--input_dir", str(config["input_dir"])])
+        if cfg.input_dir is not None:
+            cmd.extend(["--input_dir", cfg.input_dir])
         
-        if "output_dir" in config:
-            cmd.extend(["--output_dir", str(config["output_dir"])])
+        if cfg.output_dir is not None:
+            cmd.extend(["--output_dir", cfg.output_dir])
             
         # Optional args
-        
-        # Target Count
-        if "target_count" in config:
-            try:
-                tc = float(config["target_count"])
-                if tc > 0:
-                    cmd.extend(["--target_count", str(int(tc))])
-            except (ValueError, TypeError):
-                pass
+        if cfg.target_count:
+            cmd.extend(["--target_count", str(cfg.target_count)])
                 
-        # Keep Percentage
-        if "target_percentage" in config:
-            try:
-                tp = float(config["target_percentage"])
-                # Heuristic: If value > 1.0, assume it is 0-100 range and normalize
-                if tp > 1.0:
-                    tp = tp / 100.0
-                cmd.extend(["--keep_percent", str(tp)])
-            except (ValueError, TypeError):
-                pass
-
-        # Groups
-        if "groups" in config:
-            try:
-                g = float(config["groups"])
-                if g > 0:
-                    cmd.extend(["--groups", str(int(g))])
-            except (ValueError, TypeError):
-                pass
+        if cfg.keep_percent is not None:
+            cmd.extend(["--keep_percent", str(cfg.keep_percent)])
+
+        if cfg.groups:
+            cmd.extend(["--groups", str(cfg.groups)])
+
+        if cfg.threads:
+            cmd.extend(["--threads", str(cfg.threads)])
                 
-        # Dry Run
-        # Checkbox usually stores boolean or 0/1
-        dr = config.get("dry_run", False)
-        # It might be a string "0" or "1" or "False" if coming from some UI save
-        if str(dr).lower() in ("true", "1", "yes"):
-             cmd.append("--dry_run")
+        if cfg.dry_run:
+            cmd.append("--dry_run")
 
         return cmd
 
 class DeduplicateCommandBuilder:
     @staticmethod
-    def build(config: Dict[str, Any]) -> List[str]:
+    @_memoized
+    def build(cfg: DedupConfig) -> List[str]:
         """
         Builds the command line arguments for the Deduplicate script.
         """
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        # base_dir is project root
-        script_path = os.path.join(base_dir, "scripts", "deduplicate.py")
-        
-        cmd = [sys.executable, script_path]
+        cmd = list(_DEDUP_PREFIX)
         
         # Injected paths
         # Deduplicate script mainly needs input_dir. 
         # For chaining, if this follows Blur, 'input_dir' here is the 'output_dir' of Blur.
-        if "input_dir" in config:
-            cmd.extend(["--input_dir", str(config["input_dir"])])
+        if cfg.input_dir is not None:
+            cmd.extend(["--input_dir", cfg.input_dir])
 
-        if "output_dir" in config:
-            cmd.extend(["--output_dir", str(config["output_dir"])])
+        if cfg.output_dir is not None:
+            cmd.extend(["--output_dir", cfg.output_dir])
             
-        # Threshold
-        if "threshold" in config:
-            try:
-                th = float(config["threshold"])
-                # Boundary checks if needed
-                if 0.0 <= th <= 1.0:
-                    cmd.extend(["--threshold", str(th)])
-            except (ValueError, TypeError):
-                pass
+        if cfg.threshold is not None:
+            cmd.extend(["--threshold", str(cfg.threshold)])
 
         # Resolution (resize_width)
-        if "resolution" in config:
-            try:
-                # The GUI Dropdown likely returns an int or string "512"
-                res = int(config["resolution"])
-                if res > 0:
-                    cmd.extend(["--resize_width", str(res)])
-            except (ValueError, TypeError):
-                pass
+        if cfg.resize_width:
+            cmd.extend(["--resize_width", str(cfg.resize_width)])
                 
-        # Dry Run
-        dr = config.get("dry_run", False)
-        if str(dr).lower() in ("true", "1", "yes"):
-             cmd.append("--dry_run")
-             
-        # Note: 'resolution' is in the GUI but not exposed in scripts/deduplicate.py CLI arguments yet.
-        # We will need to update scripts/deduplicate.py to accept it if we want to support it.
+        if cfg.dry_run:
+            cmd.append("--dry_run")
 
         return cmd
 
 class ExtractFramesCommandBuilder:
     @staticmethod
-    def build(config: Dict[str, Any]) -> List[str]:
+    @_memoized
+    def build(cfg: ExtractConfig) -> List[str]:
         """
         Builds the command line arguments for the Extract Frames script.
         """
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        # base_dir is project root
-        script_path = os.path.join(base_dir, "scripts", "extract_frames.py")
-        
-        cmd = [sys.executable, script_path]
+        cmd = list(_EXTRACT_PREFIX)
         
         # Mandatory Arguments
-        if "input_dir" in config:
-            cmd.extend(["--input_dir", str(config["input_dir"])])
+        if cfg.input_dir is not None:
+            cmd.extend(["--input_dir", cfg.input_dir])
             
-        if "output_dir" in config:
-            cmd.extend(["--output_dir", str(config["output_dir"])])
+        if cfg.output_dir is not None:
+            cmd.extend(["--output_dir", cfg.output_dir])
             
         # Optional Arguments
-        if "format" in config:
+        if cfg.output_format is not None:
             # Dropdown value e.g. "jpg"
-            cmd.extend(["--format", str(config["format"])])
+            cmd.extend(["--format", cfg.output_format])
             
-        if "every_n" in config:
-            try:
-                n = int(config["every_n"])
-                if n > 1:
-                    cmd.extend(["--every_n", str(n)])
-            except (ValueError, TypeError):
-                pass
+        if cfg.every_n > 1:
+            cmd.extend(["--every_n", str(cfg.every_n)])
+
+        if cfg.max_side:
+            cmd.extend(["--max_side", str(cfg.max_side)])
+
+        if cfg.device == "cuda":
+            cmd.extend(["--device", "cuda"])
+
+        if cfg.keyframes_only:
+            cmd.append("--keyframes_only")
+
+        if cfg.threads:
+            cmd.extend(["--threads", str(cfg.threads)])
             
-        # Dry Run
-        dr = config.get("dry_run", False)
-        if str(dr).lower() in ("true", "1", "yes"):
-             cmd.append("--dry_run")
+        if cfg.dry_run:
+            cmd.append("--dry_run")
 
         return cmd
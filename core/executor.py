@@ -2,86 +2,270 @@ import subprocess
 import threading
 import queue
 import sys
-from typing import List, Callable, Optional
+import os
+import time
+import selectors
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Callable, Optional, Set, Tuple
+from .log_queue import LogQueue, LogProducer
+from .process_groups import signal_group, stop_groups
 
-class AsyncExecutor:
+# Size of each raw read from the child's stdout pipe
+READ_CHUNK_SIZE = 65536
+
+# Output lines are handed to the queue in batches: whichever comes first
+FLUSH_MAX_LINES = 64
+FLUSH_INTERVAL_S = 0.02
+
+# Selectors only work on pipes on POSIX. On Windows we flush after every read.
+_CAN_WAIT_ON_PIPE = os.name != "nt"
+
+# Start each command in its own process group so stop() can reach the
+# workers a script spawns (e.g. deduplicate's multiprocessing pool).
+if os.name == "nt":
+    _NEW_GROUP_KWARGS = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_GROUP_KWARGS = {"start_new_session": True}
+
+class AsyncExecutor(LogProducer):
     """
     Handles execution of shell commands in a background thread.
     Pipes stdout/stderr to a queue for the GUI to consume.
+    One persistent thread runs all commands, so chained steps don't each
+    create and tear down a reader thread.
     """
-    def __init__(self, output_queue: queue.Queue):
-        self.output_queue = output_queue
+    def __init__(self, output_queue: LogQueue):
+        super().__init__(output_queue)
         self.process: Optional[subprocess.Popen] = None
         self.is_running = False
         self._stop_event = threading.Event()
 
+        # Live processes of a run_commands() batch
+        self._shard_processes: Set[subprocess.Popen] = set()
+        self._shard_lock = threading.Lock()
+
+        # Waits on the current process' stdout (POSIX only, see _CAN_WAIT_ON_PIPE)
+        self._selector = selectors.DefaultSelector() if _CAN_WAIT_ON_PIPE else None
+
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run_jobs, name="AsyncExecutor", daemon=True)
+        self._thread.start()
+
     def run_command(self, 
                     command: List[str], 
                     finished_callback: Optional[Callable[[int], None]] = None):
         """
-        Starts a command in a separate thread.
+        Queues a command on the executor thread.
         args:
             command: List of command arguments (e.g., ['python', 'script.py', '--arg'])
             finished_callback: Function to call when process ends (receives return_code)
         """
         if self.is_running:
-            self.output_queue.put("[System]: A process is already running.\n")
+            self.post("[System]: A process is already running.\n")
             return
 
         self.is_running = True
         self._stop_event.clear()
         
-        thread = threading.Thread(
-            target=self._worker, 
-            args=(command, finished_callback), 
-            daemon=True
-        )
-        thread.start()
+        self._jobs.put((self._worker, (command, finished_callback)))
+
+    def run_commands(self,
+                     commands: List[List[str]],
+                     finished_callback: Optional[Callable[[int], None]] = None,
+                     max_workers: Optional[int] = None):
+        """
+        Runs independent commands (e.g. shards of one step) as parallel processes.
+        args:
+            commands: One argument list per process
+            finished_callback: Receives 0 if all succeeded, else the first non-zero return code
+            max_workers: Processes at a time (default: CPU count)
+        """
+        if self.is_running:
+            self.post("[System]: A process is already running.\n")
+            return
+
+        self.is_running = True
+        self._stop_event.clear()
+
+        self._jobs.put((self._run_parallel, (commands, finished_callback, max_workers)))
 
     def stop(self):
-        """Terminates the current process."""
-        if self.process and self.is_running:
-            self.output_queue.put("[System]: Terminating process...\n")
+        """
+        Terminates the current process(es) and everything they spawned. Does not block:
+        anything still alive after KILL_TIMEOUT_S is killed from a timer thread.
+        """
+        with self._shard_lock:
+            processes = [p for p in (self.process, *self._shard_processes) if p]
+        if processes and self.is_running:
+            self.post("[System]: Terminating process...\n")
             self._stop_event.set()
+            stop_groups(processes, on_error=lambda e: self.post(f"[System]: Error terminating: {e}\n"))
+
+    def _run_jobs(self):
+        while True:
+            target, args = self._jobs.get()
             try:
-                self.process.terminate()
-            except Exception as e:
-                self.output_queue.put(f"[System]: Error terminating: {e}\n")
+                target(*args)
+            except Exception:
+                # A failing job or finished_callback must not take the only job thread down,
+                # or every later command would be refused as already running
+                self.is_running = False
+                self.post(f"[System]: Internal error:\n{traceback.format_exc()}")
 
     def _worker(self, command: List[str], finished_callback: Optional[Callable[[int], None]]):
+        return_code = -1
         try:
-            self.output_queue.put(f"[System]: Starting command: {' '.join(command)}\n")
+            self.post(f"[System]: Starting command: {' '.join(command)}\n")
             
-            # Using Popen to stream output
+            # Using Popen to stream output.
+            # Binary mode + a regular block buffer: we read big chunks ourselves and
+            # split lines in Python, instead of one readline() syscall per line.
             self.process = subprocess.Popen(
                 command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT, # Redirect stderr to stdout
-                text=True,
-                bufsize=1, # Line buffered
-                universal_newlines=True
+                bufsize=-1,
+                **_NEW_GROUP_KWARGS
             )
 
-            # Read output line by line
-            for line in iter(self.process.stdout.readline, ''):
-                if self._stop_event.is_set():
-                    break
-                if line:
-                    self.output_queue.put(line)
+            fd = self.process.stdout.fileno()
+            if hasattr(os, "set_blocking"): # Not available for pipes on older Windows Pythons
+                os.set_blocking(fd, True)
+            if self._selector:
+                self._selector.register(fd, selectors.EVENT_READ)
+            try:
+                self._pump_output(fd)
+            finally:
+                if self._selector:
+                    self._selector.unregister(fd)
             
             self.process.stdout.close()
             return_code = self.process.wait()
-            
-            self.is_running = False
-            self.output_queue.put(f"[System]: Process finished with return code {return_code}\n")
-            
-            if finished_callback:
-                # Note: This calls callback in the WORKER thread. 
-                # Tkinter updates must be scheduled via after() in the main thread if this callback touches GUI.
-                finished_callback(return_code)
+            # Don't keep a reaped pid around for stop() to signal
+            self.process = None
+            self.post(f"[System]: Process finished with return code {return_code}\n")
 
         except Exception as e:
-            self.is_running = False
-            self.output_queue.put(f"[System]: Error executing command: {str(e)}\n")
-            if finished_callback:
-                finished_callback(-1)
+            self.post(f"[System]: Error executing command: {str(e)}\n")
+
+        self.is_running = False
+        # Outside the try, so a raising callback is never called a second time with -1
+        if finished_callback:
+            # Note: This calls callback in the WORKER thread. 
+            # Tkinter updates must be scheduled via after() in the main thread if this callback touches GUI.
+            finished_callback(return_code)
+
+    def _pump_output(self, fd: int):
+        """
+        Reads output in chunks and hands complete lines to the queue in batches,
+        so the GUI side isn't woken up (and the queue lock taken) per line.
+        """
+        pending = b""
+        batch: List[str] = []
+        last_flush = time.monotonic()
+        while True:
+            if batch:
+                remaining = FLUSH_INTERVAL_S - (time.monotonic() - last_flush)
+                if remaining <= 0 or not self._wait_readable(remaining):
+                    self.post(batch)
+                    batch = []
+                    last_flush = time.monotonic()
+                    continue
+
+            chunk = os.read(fd, READ_CHUNK_SIZE)
+            if not chunk or self._stop_event.is_set():
+                break
+            lines, pending = self._split_lines(pending + chunk)
+            batch.extend(lines)
+
+            if len(batch) >= FLUSH_MAX_LINES or (batch and not _CAN_WAIT_ON_PIPE):
+                self.post(batch)
+                batch = []
+                last_flush = time.monotonic()
+
+        # Flush whatever is left, including a trailing line without newline
+        if pending:
+            batch.append(pending.rstrip(b"\r").decode("utf-8", errors="replace"))
+        if batch and not self._stop_event.is_set():
+            self.post(batch)
+
+    def _run_parallel(self,
+                      commands: List[List[str]],
+                      finished_callback: Optional[Callable[[int], None]],
+                      max_workers: Optional[int]):
+        workers = max(1, min(len(commands), max_workers or os.cpu_count() or 1))
+        self.post(f"[System]: Running {len(commands)} commands, {workers} at a time.\n")
+
+        # Threads are enough here: each one just waits on its own process' pipe
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AsyncExecutorShard") as pool:
+            return_codes = list(pool.map(self._run_shard, commands))
+        return_code = next((rc for rc in return_codes if rc != 0), 0)
+
+        self.is_running = False
+        self.post(f"[System]: Process finished with return code {return_code}\n")
+
+        if finished_callback:
+            finished_callback(return_code)
+
+    def _run_shard(self, command: List[str]) -> int:
+        if self._stop_event.is_set():
+            return -1
+
+        self.post(f"[System]: Starting command: {' '.join(command)}\n")
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=-1,
+                **_NEW_GROUP_KWARGS
+            )
+        except OSError as e:
+            self.post(f"[System]: Error executing command: {str(e)}\n")
+            return -1
+
+        with self._shard_lock:
+            self._shard_processes.add(process)
+        try:
+            # stop() may have run between Popen and registering the process
+            if self._stop_event.is_set():
+                signal_group(process, kill=False)
+
+            # Lines of parallel processes interleave per chunk, never mid-line
+            fd = process.stdout.fileno()
+            pending = b""
+            while True:
+                chunk = os.read(fd, READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                lines, pending = self._split_lines(pending + chunk)
+                if lines:
+                    self.post(lines)
+            if pending:
+                self.post([pending.rstrip(b"\r").decode("utf-8", errors="replace")])
+
+            process.stdout.close()
+            return process.wait()
+        finally:
+            with self._shard_lock:
+                self._shard_processes.discard(process)
+
+    @staticmethod
+    def _split_lines(data: bytes) -> Tuple[List[str], bytes]:
+        """
+        Decodes all complete lines in data with a single decode call.
+        Returns them and the unterminated remainder (still bytes).
+        """
+        cut = data.rfind(b"\n") + 1
+        if not cut:
+            return [], data
+        # Cutting after b"\n" never splits a UTF-8 sequence
+        text = data[:cut].decode("utf-8", errors="replace").replace("\r\n", "\n")
+        return text.splitlines(keepends=True), data[cut:]
+
+    def _wait_readable(self, timeout: float) -> bool:
+        """Waits up to `timeout` seconds for output from the current process. Returns True if readable."""
+        if self._selector is None:
+            return True
+        return bool(self._selector.select(timeout))
@@ -0,0 +1,63 @@
+from collections import deque
+from typing import Any, Callable, Optional
+import queue
+import threading
+
+# Messages kept when the console falls behind; the oldest are dropped first,
+# and the console gets a "[N lines dropped]" line in their place
+DEFAULT_MAXLEN = 10000
+
+class LogQueue:
+    """
+    Output pipe between the producers (executor, worker pool, manager) and the console.
+    Any thread may put(); only the console takes items out.
+    deque append/popleft are atomic, so unlike queue.Queue no lock is taken per message;
+    only overflowing puts lock, to count what they drop.
+    """
+    def __init__(self, maxlen: Optional[int] = DEFAULT_MAXLEN):
+        self._items = deque(maxlen=maxlen)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def put(self, item: Any):
+        if len(self._items) == self._items.maxlen:
+            with self._dropped_lock:
+                try:
+                    oldest = self._items[0]
+                except IndexError:
+                    pass # Drained meanwhile, nothing is dropped
+                else:
+                    self._dropped += len(oldest) if isinstance(oldest, list) else 1
+        self._items.append(item)
+
+    def get_nowait(self) -> Any:
+        """Same contract as queue.Queue.get_nowait: raises queue.Empty when there is nothing."""
+        if self._dropped:
+            with self._dropped_lock:
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                return f"[{dropped} lines dropped]\n"
+        try:
+            return self._items.popleft()
+        except IndexError:
+            raise queue.Empty from None
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+
+class LogProducer:
+    """Base for the objects that write to a LogQueue (executor, worker pool)."""
+    def __init__(self, output_queue: LogQueue):
+        self.output_queue = output_queue
+        # Optional wake-up hook for the consumer (e.g. ConsoleWidget.notify), called after each put
+        self.on_output: Optional[Callable[[], None]] = None
+
+    def post(self, item):
+        """Puts a message (str or list of lines) on the output queue and wakes the consumer."""
+        self.output_queue.put(item)
+        if self.on_output:
+            self.on_output()
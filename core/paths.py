@@ -0,0 +1,5 @@
+import os
+
+# Resolved from this file rather than the CWD; core/ is one level below the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(PROJECT_ROOT, "scripts")
@@ -1,9 +1,22 @@
-from typing import List, Callable, Optional, Dict
+from typing import List, Callable, Optional, Dict, Set, Tuple, Any
 from sections.base_section import PipelineSection
 from .executor import AsyncExecutor
+from .worker_pool import ScriptWorkerPool, job_from_command
 from .state_models import PipelineConfiguration
 from .category import PipelineCategory, SelectionMode
 import os
+import time
+import bisect
+import traceback
+
+# How long a cached os.stat() result for a global path stays valid
+PATH_CACHE_TTL_S = 2.0
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
 
 class PipelineManager:
     """
@@ -11,32 +24,120 @@ class PipelineManager:
     """
     def __init__(self, 
                  config: PipelineConfiguration, 
-                 executor: AsyncExecutor):
+                 executor: AsyncExecutor,
+                 worker_pool: Optional[ScriptWorkerPool] = None):
         self.config = config
         self.executor = executor
+        # Optional: runs scripts/ steps in a warm, long-lived process instead of a fresh interpreter
+        self.worker_pool = worker_pool
         
         self.categories: List[PipelineCategory] = []
         
         # The Ordered List of Sections to run
         # We store the *Section Objects* directly for simplicity
         self.staged_sections: List[PipelineSection] = []
+        # Indexes kept in sync with the above, keyed by id(section)
+        self._staged_set: Set[int] = set()
+        # Category of every registered section, keyed by id(section). Read-only outside the manager.
+        self.section_to_category: Dict[int, PipelineCategory] = {}
+        # stage_index of each staged section, parallel to staged_sections
+        self._staged_stage_indices: List[int] = []
+        # Chained (input, output) dirs of each staged section, parallel to staged_sections
+        self._resolved_paths: List[Tuple[str, str]] = []
         
         self.current_step_index = 0
         self.is_sequence_running = False
+
+        # path -> (timestamp, stat result or None if missing). Keyed by path, so
+        # editing the global paths never hits a stale entry.
+        self._stat_cache: Dict[str, Tuple[float, Optional[os.stat_result]]] = {}
+        # path -> (timestamp, os.access(path, W_OK)), same TTL
+        self._access_cache: Dict[str, Tuple[float, bool]] = {}
         
         # Events
         self.on_step_status_change: Optional[Callable[[int, str], None]] = None
+        # Called (from whichever thread ends the run) once a sequence stops for any reason
+        self.on_sequence_finished: Optional[Callable[[], None]] = None
         self._staging_listeners: List[Callable[[], None]] = []
 
+        # Optional deferral hook, e.g. Tk's after_idle. When set, staging changes
+        # are coalesced into a single listener fan-out per idle tick.
+        self.schedule: Optional[Callable[[Callable[[], None]], Any]] = None
+        self._staging_dirty = False
+
     def add_staging_listener(self, callback: Callable[[], None]):
         self._staging_listeners.append(callback)
 
     def _notify_staging_changed(self):
+        self._resolve_staged_paths()
+
+        if self.schedule is None:
+            self._flush_staging_changed()
+            return
+
+        if not self._staging_dirty:
+            self._staging_dirty = True
+            self.schedule(self._flush_staging_changed)
+
+    def _flush_staging_changed(self):
+        self._staging_dirty = False
         for callback in self._staging_listeners:
             callback()
 
+    def _resolve_staged_paths(self):
+        """
+        Precomputes the chained (input, output) dirs of every staged step.
+        The first step reads the global input and every later step reads the previous
+        step's output. The last step writes to the global output, the others to
+        <output>/intermediate/<section name>.
+        """
+        g_ctx = self.config.global_context
+        intermediate_root = os.path.join(g_ctx.output_dir, "intermediate")
+        last_index = len(self.staged_sections) - 1
+
+        paths = []
+        current_input = g_ctx.input_dir
+        for idx, section in enumerate(self.staged_sections):
+            # You might want a timestamp or run ID to avoid collisions, but for now simple structure:
+            current_output = g_ctx.output_dir if idx == last_index else os.path.join(intermediate_root, section.name)
+            paths.append((current_input, current_output))
+            current_input = current_output
+        self._resolved_paths = paths
+
     def add_category(self, category: PipelineCategory):
-        self.categories.append(category)
+        # Kept sorted by stage; categories of the same stage stay in insertion order
+        bisect.insort(self.categories, category, key=lambda c: c.stage_index)
+        for section in category.sections:
+            self._register_section(category, section)
+        # Sections added to the category later are indexed too
+        category.on_section_added = self._register_section
+
+    def _register_section(self, category: PipelineCategory, section: PipelineSection):
+        self.section_to_category[id(section)] = category
+
+    def invalidate(self):
+        """Rebuilds the section -> category index. Call after moving sections between categories."""
+        self.section_to_category = {
+            id(section): category
+            for category in self.categories
+            for section in category.sections
+        }
+        self._staged_stage_indices = [self._stage_index_of(s) for s in self.staged_sections]
+
+    def _stage(self, section: PipelineSection):
+        # Insert after the last staged section of the same (or an earlier) stage,
+        # so the pipeline stays in stage order without re-sorting
+        stage_index = self._stage_index_of(section)
+        pos = bisect.bisect_right(self._staged_stage_indices, stage_index)
+        self.staged_sections.insert(pos, section)
+        self._staged_stage_indices.insert(pos, stage_index)
+        self._staged_set.add(id(section))
+
+    def _unstage(self, section: PipelineSection):
+        idx = self.staged_sections.index(section)
+        del self.staged_sections[idx]
+        del self._staged_stage_indices[idx]
+        self._staged_set.discard(id(section))
 
     def toggle_section_stage(self, section: PipelineSection, active: bool):
         """
@@ -44,20 +145,20 @@ class PipelineManager:
         Enforces Single-Select logic if needed.
         """
         if active:
-            if section not in self.staged_sections:
+            if id(section) not in self._staged_set:
                 # Logic to handle Single Select:
                 # Find the category this section belongs to
                 parent_cat = self._find_category_for_section(section)
                 if parent_cat and parent_cat.selection_mode == SelectionMode.SINGLE:
                     # Remove other sections from this category
                     for s in parent_cat.sections:
-                        if s in self.staged_sections and s != section:
-                            self.staged_sections.remove(s)
+                        if s is not section and id(s) in self._staged_set:
+                            self._unstage(s)
                 
-                self.staged_sections.append(section)
+                self._stage(section)
         else:
-            if section in self.staged_sections:
-                self.staged_sections.remove(section)
+            if id(section) in self._staged_set:
+                self._unstage(section)
                 
         self._notify_staging_changed()
 
@@ -70,50 +171,64 @@ class PipelineManager:
         if 0 <= new_index < len(self.staged_sections):
             self.staged_sections[index], self.staged_sections[new_index] = \
                 self.staged_sections[new_index], self.staged_sections[index]
+            indices = self._staged_stage_indices
+            indices[index], indices[new_index] = indices[new_index], indices[index]
             
             self._notify_staging_changed()
             return True
         return False
 
     def _find_category_for_section(self, section: PipelineSection) -> Optional[PipelineCategory]:
-        for cat in self.categories:
-            if section in cat.sections:
-                return cat
-        return None
+        return self.section_to_category.get(id(section))
+
+    def _stage_index_of(self, section: PipelineSection) -> int:
+        cat = self.section_to_category.get(id(section))
+        return cat.stage_index if cat else 0
 
     def get_category_of_section(self, section: PipelineSection) -> Optional[PipelineCategory]:
-         return self._find_category_for_section(section)
+         return self.section_to_category.get(id(section))
 
     def run_sequence(self):
-        """Runs the STAGED steps."""
+        """
+        Runs the STAGED steps. Does blocking filesystem checks before the first step
+        starts, so UIs should call it from a worker thread.
+        """
+        try:
+            self._begin_sequence()
+        except Exception:
+            # Step start-up errors are handled in _run_next_in_sequence, so none is running here.
+            # Without this the UI would never hear the sequence is over.
+            self.executor.post(f"[Manager]: Run failed:\n{traceback.format_exc()}")
+            self._finish_sequence()
+
+    def _begin_sequence(self):
         if not self.staged_sections:
-             self.executor.output_queue.put("[Manager]: No steps staged!\n")
+             self.executor.post("[Manager]: No steps staged!\n")
+             self._finish_sequence()
              return
 
         # V2: Run-time validation
         if not self._validate_order():
-             self.executor.output_queue.put("[Manager]: WARNING: Pipeline appears out of order. Running anyway...\n")
+             self.executor.post("[Manager]: WARNING: Pipeline appears out of order. Running anyway...\n")
              # In a real app, you might show a Popup here and ask to Continue/Cancel.
              # For now, we log it and proceed.
 
         if not self._validate_pipeline_environment():
-            self.executor.output_queue.put("[Manager]: Dataset Validation Failed. Aborting.\n")
+            self.executor.post("[Manager]: Dataset Validation Failed. Aborting.\n")
+            self._finish_sequence()
             return
 
+        # Global paths may have been edited since staging last changed
+        self._resolve_staged_paths()
+
         self.current_step_index = 0
         self.is_sequence_running = True
         self._run_next_in_sequence()
 
     def _validate_order(self) -> bool:
-        """Checks if stage indices strictly increase."""
-        last_index = -1
-        for section in self.staged_sections:
-            cat = self._find_category_for_section(section)
-            if cat:
-                if cat.stage_index < last_index:
-                    return False
-                last_index = cat.stage_index
-        return True
+        """Checks that stage indices never decrease."""
+        indices = self._staged_stage_indices
+        return all(a <= b for a, b in zip(indices, indices[1:]))
 
     def _validate_pipeline_environment(self) -> bool:
         """
@@ -124,78 +239,125 @@ class PipelineManager:
         g_ctx = self.config.global_context
         
         # 1. Input Check
-        if not os.path.exists(g_ctx.input_dir):
-            self.executor.output_queue.put(f"[Manager Error]: Global Input Directory does not exist: {g_ctx.input_dir}\n")
+        if self._stat_cached(g_ctx.input_dir) is None:
+            self.executor.post(f"[Manager Error]: Global Input Directory does not exist: {g_ctx.input_dir}\n")
             return False
             
         # 2. Output Check (Basic)
         # If it exists, check writable. If not, check parent writable.
-        if os.path.exists(g_ctx.output_dir):
-            if not os.access(g_ctx.output_dir, os.W_OK):
-                self.executor.output_queue.put(f"[Manager Error]: Global Output Directory is not writable: {g_ctx.output_dir}\n")
+        out_st = self._stat_cached(g_ctx.output_dir)
+        if out_st is not None:
+            if not self._is_writable(g_ctx.output_dir):
+                self.executor.post(f"[Manager Error]: Global Output Directory is not writable: {g_ctx.output_dir}\n")
                 return False
         else:
             parent = os.path.dirname(g_ctx.output_dir)
-            if parent and os.path.exists(parent) and not os.access(parent, os.W_OK):
-                self.executor.output_queue.put(f"[Manager Error]: Cannot create Output Directory (Parent not writable): {parent}\n")
+            parent_st = self._stat_cached(parent) if parent else None
+            if parent_st is not None and not self._is_writable(parent):
+                self.executor.post(f"[Manager Error]: Cannot create Output Directory (Parent not writable): {parent}\n")
                 return False
                 
         return True
 
+    @staticmethod
+    def _cached(cache: Dict[str, Tuple[float, Any]], path: str, probe: Callable[[str], Any]) -> Any:
+        """probe(path), reused from cache for PATH_CACHE_TTL_S."""
+        now = time.monotonic()
+        hit = cache.get(path)
+        if hit and now - hit[0] < PATH_CACHE_TTL_S:
+            return hit[1]
+
+        result = probe(path)
+        cache[path] = (now, result)
+        return result
+
+    def _stat_cached(self, path: str) -> Optional[os.stat_result]:
+        """os.stat() with a short TTL cache. Returns None if the path doesn't exist."""
+        return self._cached(self._stat_cache, path, _stat_or_none)
+
+    def _is_writable(self, path: str) -> bool:
+        # os.access also covers group/other bits, ACLs and read-only mounts
+        return self._cached(self._access_cache, path, lambda p: os.access(p, os.W_OK))
+
     def _run_next_in_sequence(self):
+        try:
+            self._start_next_step()
+        except Exception:
+            # Raised before the step's process was started (commit, validate, shard, build)
+            self.executor.post(f"[Manager]: Step failed to start:\n{traceback.format_exc()}")
+            self._finish_sequence()
+            self._notify_status(self.current_step_index, "Error")
+
+    def _start_next_step(self):
         if not self.is_sequence_running:
+            # Stopped while the previous step was finishing
+            self._finish_sequence()
             return
 
         if self.current_step_index >= len(self.staged_sections):
-            self.executor.output_queue.put("[Manager]: Sequence Complete.\n")
-            self.is_sequence_running = False
+            self.executor.post("[Manager]: Sequence Complete.\n")
+            self._finish_sequence()
             return
 
         section = self.staged_sections[self.current_step_index]
-        self.executor.output_queue.put(f"\n[Manager]: Starting Step {self.current_step_index+1}: {section.name}\n")
+        self.executor.post(f"\n[Manager]: Starting Step {self.current_step_index+1}: {section.name}\n")
+
+        # Edits made just before Run may still be waiting out the widget debounce
+        section.commit_pending()
         
         if not section.validate():
-            self.executor.output_queue.put(f"[Manager]: Step '{section.name}' validation failed.\n")
-            self.is_sequence_running = False
+            self.executor.post(f"[Manager]: Step '{section.name}' validation failed.\n")
+            self._finish_sequence()
             self._notify_status(self.current_step_index, "Error")
             return
 
-        # Chaining Logic (Snaking)
-        # Determine Input
-        if self.current_step_index == 0:
-            current_input = self.config.global_context.input_dir
-        else:
-            # Input comes from previous step's output
-            current_input = self.staged_sections[self.current_step_index - 1].output_path
-
-        # Determine Output
-        if self.current_step_index == len(self.staged_sections) - 1:
-            current_output = self.config.global_context.output_dir
-        else:
-            # Intermediate output
-            # We'll create a folder named after the section inside the global output/intermediate
-            # You might want a timestamp or run ID to avoid collisions, but for now simple structure:
-            current_output = os.path.join(self.config.global_context.output_dir, "intermediate", section.name)
+        # Chaining Logic (Snaking), precomputed by _resolve_staged_paths
+        current_input, current_output = self._resolved_paths[self.current_step_index]
             
         # Ensure output directory exists (especially intermediate ones)
-        if current_output and not os.path.exists(current_output):
-             try:
-                 os.makedirs(current_output, exist_ok=True)
-             except OSError as e:
-                 self.executor.output_queue.put(f"[Manager]: Failed to create output dir {current_output}: {e}\n")
-                 # We continue, let the script complain if it fails
+        # exist_ok already covers the "exists" case, no separate stat needed
+        if current_output:
+            try:
+                os.makedirs(current_output, exist_ok=True)
+            except OSError as e:
+                self.executor.post(f"[Manager]: Failed to create output dir {current_output}: {e}\n")
+                # We continue, let the script complain if it fails
 
         # Apply paths to section
         section.set_paths(current_input, current_output)
         
         # Log for verification
-        self.executor.output_queue.put(f"   -> Input: {current_input}\n")
-        self.executor.output_queue.put(f"   -> Output: {current_output}\n")
+        self.executor.post(f"   -> Input: {current_input}\n")
+        self.executor.post(f"   -> Output: {current_output}\n")
+
+        shards = section.shard(current_input, current_output) if section.shardable else []
+        if len(shards) > 1:
+            # Independent pieces of this step run as parallel processes. The scripts
+            # parallelize internally too, so each shard gets an equal slice of the cores.
+            cpus = os.cpu_count() or 1
+            parallel = min(len(shards), cpus)
+            commands = section.build_shard_commands(shards, threads=max(1, cpus // parallel))
+            self.executor.post(f"   -> Split into {len(shards)} shards\n")
+            self._notify_status(self.current_step_index, "Running")
+
+            jobs = [job_from_command(c) for c in commands] if self.worker_pool else []
+            if jobs and all(jobs):
+                # Warm workers, no fresh interpreter per shard
+                self.worker_pool.submit_many(jobs, lambda rc: self._on_sequence_step_finished(rc),
+                                             max_workers=parallel)
+            else:
+                self.executor.run_commands(commands, lambda rc: self._on_sequence_step_finished(rc),
+                                           max_workers=parallel)
+            return
 
         cmd = section.build_command()
         self._notify_status(self.current_step_index, "Running")
         
-        self.executor.run_command(cmd, lambda rc: self._on_sequence_step_finished(rc))
+        job = job_from_command(cmd) if self.worker_pool else None
+        if job:
+            self.worker_pool.submit(job, lambda rc: self._on_sequence_step_finished(rc))
+        else:
+            self.executor.run_command(cmd, lambda rc: self._on_sequence_step_finished(rc))
 
     def _on_sequence_step_finished(self, return_code: int):
         if return_code == 0:
@@ -204,8 +366,13 @@ class PipelineManager:
             self._run_next_in_sequence()
         else:
             self._notify_status(self.current_step_index, "Failed")
-            self.executor.output_queue.put("[Manager]: Aborted.\n")
-            self.is_sequence_running = False
+            self.executor.post("[Manager]: Aborted.\n")
+            self._finish_sequence()
+
+    def _finish_sequence(self):
+        self.is_sequence_running = False
+        if self.on_sequence_finished:
+            self.on_sequence_finished()
 
     def _notify_status(self, index: int, status: str):
         if self.on_step_status_change:
@@ -214,3 +381,5 @@ class PipelineManager:
     def stop_sequence(self):
         self.is_sequence_running = False
         self.executor.stop()
+        if self.worker_pool:
+            self.worker_pool.stop()
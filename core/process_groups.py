@@ -0,0 +1,50 @@
+import os
+import signal
+import subprocess
+import threading
+from typing import Callable, List, Optional
+
+# Grace period between the polite stop signal and a hard kill
+KILL_TIMEOUT_S = 2.0
+
+
+def signal_group(process, kill: bool):
+    """
+    Signals `process` (a subprocess.Popen or multiprocessing.Process started in its own
+    process group) and everything it spawned. kill=False asks politely.
+    """
+    if os.name == "nt":
+        if not kill and isinstance(process, subprocess.Popen):
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        elif not kill:
+            process.terminate()
+        elif (process.poll() is None) if isinstance(process, subprocess.Popen) else process.is_alive():
+            process.kill()
+    else:
+        # Even if the leader already exited, its children may still be around
+        os.killpg(process.pid, signal.SIGKILL if kill else signal.SIGTERM)
+
+
+def kill_groups(processes: List):
+    for process in processes:
+        try:
+            signal_group(process, kill=True)
+        except OSError:
+            pass # Already gone
+
+
+def stop_groups(processes: List, on_error: Optional[Callable[[Exception], None]] = None):
+    """
+    Politely stops each process group now and kills whatever is left after KILL_TIMEOUT_S
+    from a timer thread, so the caller never blocks. on_error receives failures of the polite signal.
+    """
+    for process in processes:
+        try:
+            signal_group(process, kill=False)
+        except Exception as e:
+            if on_error:
+                on_error(e)
+
+    timer = threading.Timer(KILL_TIMEOUT_S, kill_groups, args=(processes,))
+    timer.daemon = True
+    timer.start()
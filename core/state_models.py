@@ -1,8 +1,14 @@
-from dataclasses import dataclass, field
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, Union
 import os
 
-@dataclass
+try:
+    import orjson # Optional, much faster than json for large configs
+except ImportError:
+    orjson = None
+    import json
+
+@dataclass(slots=True)
 class GlobalContext:
     """
     Holds high-level paths and global settings accessible by all sections.
@@ -32,18 +38,16 @@ class PipelineConfiguration:
     section_settings: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
     def get_section_config(self, section_name: str) -> Dict[str, Any]:
-        if section_name not in self.section_settings:
-            self.section_settings[section_name] = {}
-        return self.section_settings[section_name]
+        return self.section_settings.setdefault(section_name, {})
 
     def update_section_config(self, section_name: str, key: str, value: Any):
-        config = self.get_section_config(section_name)
-        config[key] = value
+        # Called on every widget change: one lookup instead of two
+        self.section_settings.setdefault(section_name, {})[key] = value
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize for saving to JSON/YAML."""
         return {
-            "global": self.global_context.__dict__,
+            "global": asdict(self.global_context), # slotted, so no __dict__
             "sections": self.section_settings
         }
 
@@ -56,3 +60,130 @@ class PipelineConfiguration:
         if "sections" in data:
             config.section_settings = data["sections"]
         return config
+
+    def dumps(self) -> bytes:
+        """Serialize to JSON bytes (for saving to disk)."""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(self.to_dict(), separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def loads(cls, data: Union[bytes, str]) -> 'PipelineConfiguration':
+        """Load from JSON produced by `dumps`."""
+        if orjson is not None:
+            return cls.from_dict(orjson.loads(data))
+        return cls.from_dict(json.loads(data))
+
+
+# --- Typed per-step settings ---
+# Built once from a section's config dict (which holds raw widget values),
+# so command builders can work with plain typed fields.
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    # It might be a string "0" or "1" or "False" if coming from some UI save
+    return str(value).lower() in ("true", "1", "yes")
+
+def _as_positive_int(value: Any) -> int:
+    """Returns int(value) if it is > 0, else 0. Accepts "12", 12.0, etc."""
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return 0
+    return int(number) if number > 0 else 0
+
+def _as_optional_str(data: Dict[str, Any], key: str) -> Optional[str]:
+    return str(data[key]) if key in data else None
+
+@dataclass(frozen=True)
+class BlurConfig:
+    """Settings for the Blur Filter step."""
+    input_dir: Optional[str] = None
+    output_dir: Optional[str] = None
+    target_count: int = 0                  # 0 = derive from keep_percent
+    keep_percent: Optional[float] = None   # 0.0 - 1.0
+    groups: int = 0                        # 0 = script default
+    threads: int = 0                       # CPU budget when sharded, 0 = all cores
+    dry_run: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BlurConfig':
+        keep_percent = None
+        try:
+            keep_percent = float(data["target_percentage"])
+            # Heuristic: If value > 1.0, assume it is 0-100 range and normalize
+            if keep_percent > 1.0:
+                keep_percent = keep_percent / 100.0
+        except (KeyError, ValueError, TypeError):
+            pass
+
+        return cls(
+            input_dir=_as_optional_str(data, "input_dir"),
+            output_dir=_as_optional_str(data, "output_dir"),
+            target_count=_as_positive_int(data.get("target_count")),
+            keep_percent=keep_percent,
+            groups=_as_positive_int(data.get("groups")),
+            threads=_as_positive_int(data.get("threads")),
+            dry_run=_as_bool(data.get("dry_run", False)),
+        )
+
+@dataclass(frozen=True)
+class DedupConfig:
+    """Settings for the Deduplicate step."""
+    input_dir: Optional[str] = None
+    output_dir: Optional[str] = None
+    threshold: Optional[float] = None      # Share of matching dHash bits, 0.0 - 1.0
+    resize_width: int = 0                  # 0 = script default
+    dry_run: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DedupConfig':
+        threshold = None
+        try:
+            threshold = float(data["threshold"])
+            if not 0.0 <= threshold <= 1.0:
+                threshold = None
+        except (KeyError, ValueError, TypeError):
+            pass
+
+        return cls(
+            input_dir=_as_optional_str(data, "input_dir"),
+            output_dir=_as_optional_str(data, "output_dir"),
+            threshold=threshold,
+            # The GUI Dropdown likely returns an int or string "512"
+            resize_width=_as_positive_int(data.get("resolution")),
+            dry_run=_as_bool(data.get("dry_run", False)),
+        )
+
+@dataclass(frozen=True)
+class ExtractConfig:
+    """Settings for the Frame Extraction step."""
+    input_dir: Optional[str] = None
+    output_dir: Optional[str] = None
+    output_format: Optional[str] = None    # e.g. "jpg"
+    every_n: int = 1
+    keyframes_only: bool = False           # Decode keyframes only (fast, approximate spacing)
+    max_side: int = 0                      # 0 = full resolution
+    device: str = "cpu"                    # "cpu" or "cuda" (NVDEC decode)
+    threads: int = 0                       # CPU budget when sharded, 0 = all cores
+    dry_run: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ExtractConfig':
+        try:
+            every_n = max(1, int(data.get("every_n", 1)))
+        except (ValueError, TypeError):
+            every_n = 1
+
+        return cls(
+            input_dir=_as_optional_str(data, "input_dir"),
+            output_dir=_as_optional_str(data, "output_dir"),
+            output_format=_as_optional_str(data, "format"),
+            every_n=every_n,
+            keyframes_only=_as_bool(data.get("keyframes_only", False)),
+            max_side=_as_positive_int(data.get("max_side")),
+            device="cuda" if data.get("device") == "cuda" else "cpu",
+            threads=_as_positive_int(data.get("threads")),
+            dry_run=_as_bool(data.get("dry_run", False)),
+        )
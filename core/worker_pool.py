@@ -0,0 +1,292 @@
+import multiprocessing
+import importlib
+import traceback
+import threading
+import queue
+import io
+import collections
+import os
+import sys
+from typing import List, Dict, Any, Callable, Optional
+from .log_queue import LogQueue, LogProducer
+from .process_groups import kill_groups, stop_groups
+from .paths import SCRIPTS_DIR
+
+# Imported once when the worker starts so individual steps don't pay for them
+_HEAVY_MODULES = ("numpy", "cv2")
+
+
+def job_from_command(command: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Maps a `[python, scripts/<name>.py, *args]` command to a worker job.
+    Returns None for anything else (e.g. `python -c ...`), which should run as a normal subprocess.
+    """
+    if len(command) < 2 or command[0] != sys.executable:
+        return None
+
+    script_dir, script_file = os.path.split(command[1])
+    name, ext = os.path.splitext(script_file)
+    if ext != ".py" or os.path.normcase(os.path.abspath(script_dir)) != os.path.normcase(SCRIPTS_DIR):
+        return None
+
+    return {"script": name, "argv": list(command[2:])}
+
+
+class _QueueWriter(io.TextIOBase):
+    """stdout/stderr replacement inside the worker. Forwards complete lines to the parent."""
+    def __init__(self, result_queue):
+        self._result_queue = result_queue
+        self._buffer: List[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._buffer.append(text)
+        if "\n" in text:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            self._result_queue.put(("output", "".join(self._buffer)))
+            self._buffer.clear()
+
+
+def _preload_heavy_imports():
+    for name in _HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def _restore_environ(saved: Dict[str, str]):
+    for key in [key for key in os.environ if key not in saved]:
+        del os.environ[key]
+    for key, value in saved.items():
+        if os.environ.get(key) != value:
+            os.environ[key] = value
+
+
+def _dispatch(job: Dict[str, Any]) -> int:
+    """
+    Runs one job inside the worker. Script modules stay cached in sys.modules between jobs,
+    but process-wide settings a script changes (environment variables, cv2's thread count)
+    are put back afterwards, as if the job had run in its own process.
+    """
+    saved_environ = dict(os.environ)
+    cv2 = sys.modules.get("cv2")
+    # -1 restores OpenCV's default, for a cv2 first imported by this job
+    saved_cv2_threads = cv2.getNumThreads() if cv2 is not None else -1
+    try:
+        module = importlib.import_module(job["script"])
+        module.main(job["argv"])
+        return 0
+    except SystemExit as e:
+        # argparse errors and explicit sys.exit() calls
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        _restore_environ(saved_environ)
+        cv2 = sys.modules.get("cv2")
+        if cv2 is not None:
+            cv2.setNumThreads(saved_cv2_threads)
+
+
+def _worker_main(job_queue, result_queue):
+    # Own process group, so stop() also reaches the pools the scripts start
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+    _preload_heavy_imports()
+
+    # Scripts are imported as top-level modules so their own multiprocessing
+    # pools can pickle classes by module name.
+    sys.path.insert(0, SCRIPTS_DIR)
+    sys.stdout = sys.stderr = _QueueWriter(result_queue)
+    result_queue.put(("ready", None))
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+        return_code = _dispatch(job)
+        sys.stdout.flush()
+        result_queue.put(("done", return_code))
+
+
+class ScriptWorkerPool(LogProducer):
+    """
+    Runs the bundled scripts/ steps in long-lived Python processes instead of
+    starting a fresh interpreter (and re-importing cv2/numpy) for every step.
+    One worker normally; submit_many adds more for the shards of one step,
+    which stay alive for the next one.
+    Output is streamed back into the same queue the AsyncExecutor uses.
+    """
+    def __init__(self, output_queue: LogQueue):
+        super().__init__(output_queue)
+        self.is_running = False
+
+        # spawn: the worker must not inherit Tk state from the GUI process
+        self._ctx = multiprocessing.get_context("spawn")
+        # Workers share one job queue and one result queue
+        self._processes: List[multiprocessing.Process] = []
+        self._job_queue = None
+        self._result_queue = None
+        # Jobs go onto the queue only as workers become idle, so a warm worker
+        # can't take a whole batch while the others are still importing
+        self._pending: collections.deque = collections.deque()
+        self._idle_workers = 0
+        self._lock = threading.Lock()
+        self._finished_callback: Optional[Callable[[int], None]] = None
+        # Jobs of the current submit still running, and the first failure among them
+        self._jobs_left = 0
+        self._return_code = 0
+
+    def start(self, count: int = 1):
+        """Starts workers until `count` are alive, so heavy imports are warm before the first job."""
+        self._processes = [p for p in self._processes if p.is_alive()]
+        if not self._processes:
+            # Fresh queues: a killed worker can leave the old ones unusable
+            self._job_queue = self._ctx.Queue()
+            self._result_queue = self._ctx.Queue()
+            with self._lock:
+                self._pending.clear()
+                self._idle_workers = 0
+            threading.Thread(
+                target=self._listen,
+                args=(self._result_queue,),
+                daemon=True
+            ).start()
+
+        for _ in range(count - len(self._processes)):
+            # Not a daemon: daemonic processes may not start children, and the scripts use multiprocessing
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(self._job_queue, self._result_queue),
+                name="ScriptWorker"
+            )
+            process.start()
+            self._processes.append(process)
+
+    def submit(self,
+               job: Dict[str, Any],
+               finished_callback: Optional[Callable[[int], None]] = None):
+        """
+        Queues a job (see `job_from_command`) on the worker.
+        finished_callback receives the return code, called from the listener thread.
+        """
+        self.submit_many([job], finished_callback)
+
+    def submit_many(self,
+                    jobs: List[Dict[str, Any]],
+                    finished_callback: Optional[Callable[[int], None]] = None,
+                    max_workers: int = 1):
+        """
+        Runs independent jobs (e.g. shards of one step) on up to max_workers workers at once.
+        finished_callback receives 0 if all succeeded, else the first non-zero return code.
+        Each job is handed out once a worker is idle, and the workers stay alive for later batches.
+        """
+        if self.is_running:
+            self.post("[System]: A process is already running.\n")
+            return
+
+        workers = max(1, min(len(jobs), max_workers))
+        self.start(workers)
+        self.is_running = True
+        self._finished_callback = finished_callback
+        self._jobs_left = len(jobs)
+        self._return_code = 0
+
+        if len(jobs) > 1:
+            self.post(f"[System]: Running {len(jobs)} jobs, {workers} at a time.\n")
+        for job in jobs:
+            self.post(f"[System]: Starting job: {job['script']} {' '.join(job['argv'])}\n")
+        with self._lock:
+            self._pending.extend(jobs)
+        self._feed_idle_workers()
+
+    def stop(self):
+        """
+        Kills the workers (and their children) mid-job without blocking.
+        Fresh workers are started on the next submit.
+        """
+        processes = list(self._processes)
+        if processes and self.is_running:
+            self.post("[System]: Terminating worker...\n")
+            stop_groups(processes)
+
+    def shutdown(self):
+        """Asks the workers to exit. Call on application close."""
+        processes, self._processes = self._processes, []
+        for process in processes:
+            if process.is_alive():
+                if self.is_running:
+                    process.terminate()
+                else:
+                    self._job_queue.put(None)
+        for process in processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.kill()
+
+    def _listen(self, result_queue):
+        while True:
+            try:
+                kind, payload = result_queue.get(timeout=0.5)
+            except queue.Empty:
+                if result_queue is not self._result_queue:
+                    return # Replaced by a fresh set of workers
+                processes = self._processes
+                # exitcode is None while alive and 0 after a worker was asked to exit
+                if any(p.exitcode for p in processes) or not any(p.is_alive() for p in processes):
+                    # Stopped or crashed. Jobs of the rest would be lost with the queues,
+                    # so the whole set goes and the next submit starts fresh workers
+                    kill_groups([p for p in processes if p.is_alive()])
+                    self._processes = []
+                    with self._lock:
+                        self._pending.clear()
+                    if self.is_running:
+                        self._finish(-1)
+                    return
+                continue
+
+            if kind == "output":
+                self.post(payload)
+            elif kind == "ready":
+                self._worker_idle()
+            elif kind == "done":
+                self._worker_idle()
+                self._job_done(payload)
+
+    def _worker_idle(self):
+        with self._lock:
+            self._idle_workers += 1
+        self._feed_idle_workers()
+
+    def _feed_idle_workers(self):
+        with self._lock:
+            while self._idle_workers and self._pending:
+                self._job_queue.put(self._pending.popleft())
+                self._idle_workers -= 1
+
+    def _job_done(self, return_code: int):
+        if return_code != 0 and self._return_code == 0:
+            self._return_code = return_code
+        self._jobs_left -= 1
+        if self._jobs_left == 0:
+            self._finish(self._return_code)
+
+    def _finish(self, return_code: int):
+        self.is_running = False
+        self.post(f"[System]: Process finished with return code {return_code}\n")
+
+        callback, self._finished_callback = self._finished_callback, None
+        if callback:
+            callback(return_code)
@@ -1,13 +1,14 @@
 import tkinter as tk
-import queue
+import threading
 
 from core.pipeline_manager import PipelineManager
 from core.executor import AsyncExecutor
+from core.log_queue import LogQueue
 from .console_widget import ConsoleWidget
-from .section_frames import SectionFrame
 from .library_widget import LibraryWidget
 from .preview_widget import PreviewWidget
-from .path_selection_window import PathSelectionWindow
+# SectionFrame and PathSelectionWindow are only needed once the user clicks
+# something, so they are imported on first use to keep startup lean.
 
 class AppWindow(tk.Tk):
     """
@@ -15,7 +16,7 @@ class AppWindow(tk.Tk):
     [Library (Tree) | Settings (Forms) | Preview (List)]
     [               Console                            ]
     """
-    def __init__(self, manager: PipelineManager, executor: AsyncExecutor, output_queue: queue.Queue):
+    def __init__(self, manager: PipelineManager, executor: AsyncExecutor, output_queue: LogQueue):
         super().__init__()
         self.title("Gaussian Splatting Pipeline V2")
         self.geometry("1400x800")
@@ -24,8 +25,15 @@ class AppWindow(tk.Tk):
         self.executor = executor
         self.output_queue = output_queue
         
+        # SectionFrame per id(section), and the one currently shown
+        self._section_frames = {}
+        self._current_frame = None
+        
         # Event wiring
+        # Coalesce staging notifications into one refresh per idle tick
+        self.manager.schedule = self.after_idle
         self.manager.add_staging_listener(self._on_global_staging_change)
+        self.manager.on_sequence_finished = self._notify_run_finished
         
         self._setup_ui()
 
@@ -34,14 +42,30 @@ class AppWindow(tk.Tk):
         self.preview_widget.refresh()
         # Update Library Toggles (handled by its own listener, but safe to keep decoupling if needed)
 
+    def _start_run(self):
+        # Validation stats the dataset paths, which can stall on slow drives: keep it off the mainloop
+        self.run_button.config(state='disabled')
+        threading.Thread(target=self.manager.run_sequence, name="RunSequence", daemon=True).start()
+
+    def _notify_run_finished(self):
+        # Called from the executor / run thread: hand over to the mainloop
+        try:
+            self.after(0, self._on_run_finished)
+        except (tk.TclError, RuntimeError):
+            pass # Window already closed
+
+    def _on_run_finished(self):
+        self.run_button.config(state='normal')
+
     def _setup_ui(self):
         # Toolbar
         toolbar = tk.Frame(self, bd=1, relief=tk.RAISED)
         toolbar.pack(side='top', fill='x', padx=5, pady=5)
         
         # NOTE: Removed 'bg' kwarg which causes empty buttons on Mac
-        tk.Button(toolbar, text="Run Staged Pipeline", command=lambda: self.manager.run_sequence()).pack(side='left', padx=5)
-        tk.Button(toolbar, text="STOP", command=lambda: self.manager.stop_sequence()).pack(side='left', padx=5)
+        self.run_button = tk.Button(toolbar, text="Run Staged Pipeline", command=self._start_run)
+        self.run_button.pack(side='left', padx=5)
+        tk.Button(toolbar, text="STOP", command=self.manager.stop_sequence).pack(side='left', padx=5)
         
         # Separator / Spacer
         tk.Frame(toolbar, width=20).pack(side='left')
@@ -71,20 +95,30 @@ class AppWindow(tk.Tk):
         self.console = ConsoleWidget(bottom_frame, self.output_queue)
         self.console.pack(fill='both', expand=True)
 
+        # Let the background producers wake the console up as soon as output arrives
+        self.executor.on_output = self.console.notify
+        if self.manager.worker_pool:
+            self.manager.worker_pool.on_output = self.console.notify
+
     def _show_section_options(self, section):
-        # Clear container
-        for widget in self.options_container.winfo_children():
-            widget.destroy()
-        
-        # Render
-        frame = SectionFrame(self.options_container, section)
-        frame.pack(fill='both', expand=True, padx=20, pady=20)
-        section.on_show()
+        from .section_frames import SectionFrame
 
-        frame.pack(fill='both', expand=True, padx=20, pady=20)
+        # Each section's options are built once, then swapped in and out
+        frame = self._section_frames.get(id(section))
+        if frame is None:
+            frame = SectionFrame(self.options_container, section)
+            self._section_frames[id(section)] = frame
+        
+        if frame is not self._current_frame:
+            if self._current_frame is not None:
+                self._current_frame.pack_forget()
+            frame.pack(fill='both', expand=True, padx=20, pady=20)
+            self._current_frame = frame
         section.on_show()
 
     def _open_path_selection(self):
+        from .path_selection_window import PathSelectionWindow
+
         win = PathSelectionWindow(self, self.manager.config)
         win.set_callback(self.preview_widget.refresh)
         # Optional: Make it modal
@@ -1,13 +1,28 @@
 import tkinter as tk
 from tkinter import scrolledtext
 import queue
+from core.log_queue import LogQueue
+
+# Messages drained per poll at most, so a flood of output can't stall the mainloop
+MAX_BATCH_MESSAGES = 512
+
+# Only the tail of the log is kept, so inserts and scrolling don't slow down as it grows
+MAX_LINES = 5000
+
+# Prefix of the manager's error lines, highlighted in the console
+ERROR_PREFIX = "[Manager Error]:"
+
+# Poll interval bounds: fast while output flows, backing off (doubling) when idle
+MIN_POLL_INTERVAL_MS = 20
+MAX_POLL_INTERVAL_MS = 500
 
 class ConsoleWidget(tk.Frame):
     """
     A unified Output Console.
-    Polls a thread-safe Queue to update the text widget.
+    Drains a thread-safe Queue into the text widget when producers call `notify`,
+    with an adaptive poll timer as a safety net.
     """
-    def __init__(self, parent: tk.Widget, output_queue: queue.Queue, poll_interval_ms: int = 100):
+    def __init__(self, parent: tk.Widget, output_queue: LogQueue, poll_interval_ms: int = 100):
         super().__init__(parent)
         self.output_queue = output_queue
         self.poll_interval_ms = poll_interval_ms
@@ -15,26 +30,82 @@ class ConsoleWidget(tk.Frame):
         # UI Setup
         self.text_area = scrolledtext.ScrolledText(self, state='disabled', height=10)
         self.text_area.pack(fill='both', expand=True)
+        self.text_area.tag_configure("Manager Error", foreground="red")
         
+        # Producers wake us up through notify() instead of waiting for the next poll
+        self._wakeup_pending = False
+        self.bind("<<LogReady>>", self._on_log_ready)
+
         # Start Polling
         self.after(self.poll_interval_ms, self._poll_queue)
 
+    def notify(self):
+        """Signals that the queue has new messages. Safe to call from any thread."""
+        if self._wakeup_pending:
+            return
+        self._wakeup_pending = True
+        try:
+            self.event_generate("<<LogReady>>", when='tail')
+        except (tk.TclError, RuntimeError):
+            # Widget gone or mainloop not running (yet); the poll timer still drains
+            self._wakeup_pending = False
+
+    def _on_log_ready(self, event=None):
+        self._wakeup_pending = False
+        self._poll_queue_once()
+
     def _poll_queue(self):
-        """Checks for new messages in the queue."""
+        """Safety-net poll. Polls faster while messages arrive, slower when idle."""
         try:
-            while True:
+            if self._poll_queue_once():
+                self.poll_interval_ms = MIN_POLL_INTERVAL_MS
+            else:
+                self.poll_interval_ms = min(self.poll_interval_ms * 2, MAX_POLL_INTERVAL_MS)
+        finally:
+            # Reschedule poll
+            self.after(self.poll_interval_ms, self._poll_queue)
+
+    def _poll_queue_once(self) -> int:
+        """Appends everything queued (up to MAX_BATCH_MESSAGES). Returns the number of messages drained."""
+        parts = []
+        try:
+            while len(parts) < MAX_BATCH_MESSAGES:
                 # Get all available messages (non-blocking)
                 text = self.output_queue.get_nowait()
-                self._append_text(text)
-                self.output_queue.task_done()
+                # The executor forwards output in batches (one list per read chunk)
+                if isinstance(text, list):
+                    parts.extend(text)
+                else:
+                    parts.append(text)
         except queue.Empty:
             pass
-        finally:
-            # Reschedule poll
-            self.after(self.poll_interval_ms, self._poll_queue)
+        # One insert per drain instead of one per message
+        if parts:
+            self._append_text("".join(parts))
+        return len(parts)
 
     def _append_text(self, text: str):
         self.text_area.config(state='normal')
+        line, column = map(int, self.text_area.index('end-1c').split('.'))
         self.text_area.insert(tk.END, text)
+        if ERROR_PREFIX in text:
+            self._tag_errors(text, line, column)
+        line_count = int(self.text_area.index('end-1c').split('.')[0])
+        if line_count > MAX_LINES:
+            self.text_area.delete('1.0', f'{line_count - MAX_LINES + 1}.0')
         self.text_area.see(tk.END) # Auto-scroll
         self.text_area.config(state='disabled')
+
+    def _tag_errors(self, text: str, first_line: int, first_column: int):
+        """Highlights error prefixes in text, which was inserted at first_line.first_column."""
+        ranges = []
+        for offset, line_text in enumerate(text.split('\n')):
+            # The first piece continues a partial line unless it started at column 0
+            if offset == 0 and first_column != 0:
+                continue
+            if line_text.startswith(ERROR_PREFIX):
+                line = first_line + offset
+                ranges += (f"{line}.0", f"{line}.{len(ERROR_PREFIX)}")
+        if ranges:
+            # Tk takes any number of ranges in one call
+            self.text_area.tag_add("Manager Error", *ranges)
@@ -4,6 +4,10 @@ from typing import Callable, Optional
 from core.pipeline_manager import PipelineManager
 from core.category import SelectionMode
 
+# Staged column markers
+CHECKED = '\u2611'
+UNCHECKED = '\u2610'
+
 class LibraryWidget(tk.Frame):
     """
     Left Sidebar.
@@ -20,64 +24,53 @@ class LibraryWidget(tk.Frame):
         self.manager.add_staging_listener(self._refresh_toggles)
 
     def _setup_ui(self):
-        # We use a Canvas+Frame to allow scrolling if list is long
-        canvas = tk.Canvas(self, bg='lightgray')
-        scrollbar = tk.Scrollbar(self, orient="vertical", command=canvas.yview)
-        self.scrollable_frame = tk.Frame(canvas, bg='lightgray')
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        # One Treeview (renders only the visible rows) instead of a Frame per section
+        self.tree = ttk.Treeview(self, columns=('staged',), show='tree headings', selectmode='browse')
+        self.tree.heading('#0', text='Step', anchor='w')
+        self.tree.heading('staged', text='Staged')
+        self.tree.column('staged', width=60, stretch=False, anchor='center')
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
         
-        canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side="left", fill="both", expand=True)
+        self.tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
-        self.toggle_vars = {} # Map section.name -> tk.BooleanVar
+        self.sections = {} # Map section.name (row iid) -> section
+        self._last_staged = frozenset() # Names shown as staged
 
         for category in self.manager.categories:
             # Header
-            cat_frame = tk.Frame(self.scrollable_frame, bg='darkgray', pady=2)
-            cat_frame.pack(fill='x', pady=2)
-            tk.Label(cat_frame, text=category.name, bg='darkgray', font=('Helvetica', 10, 'bold')).pack(anchor='w', padx=5)
+            cat_iid = self.tree.insert('', 'end', text=category.name, open=True)
             
             # Items
             for section in category.sections:
-                row = tk.Frame(self.scrollable_frame, bg='lightgray')
-                row.pack(fill='x', padx=10, pady=1)
-                
-                # Checkbox for Staging
-                var = tk.BooleanVar(value=False)
-                self.toggle_vars[section.name] = var
-                
-                # We need to capture 'section' in lambda properly
-                cmd = lambda s=section, v=var: self._on_toggle(s, v)
-                
-                chk = tk.Checkbutton(row, variable=var, command=cmd, bg='lightgray')
-                chk.pack(side='left')
-                
-                # Clickable Label for Viewing
-                lbl = tk.Label(row, text=section.name, bg='lightgray', cursor="hand2")
-                lbl.pack(side='left', fill='x', expand=True, anchor='w')
-                lbl.bind("<Button-1>", lambda e, s=section: self.on_view_section(s))
+                self.tree.insert(cat_iid, 'end', iid=section.name, text=section.name, values=(UNCHECKED,))
+                self.sections[section.name] = section
+
+        # A single handler for all rows: the Staged column toggles, the name views options
+        self.tree.bind("<Button-1>", self._on_click)
 
-    def _on_toggle(self, section, var):
-        is_staged = var.get()
+    def _on_click(self, event):
+        section = self.sections.get(self.tree.identify_row(event.y))
+        if section is None:
+            return # Category header or empty space
+        
+        if self.tree.identify_column(event.x) == '#1':
+            self._on_toggle(section)
+        else:
+            self.on_view_section(section)
+
+    def _on_toggle(self, section):
+        is_staged = self.tree.set(section.name, 'staged') != CHECKED
         self.manager.toggle_section_stage(section, is_staged)
         # Refresh is triggered by callback to handle Single-Select logic automatically updating UI
 
     def _refresh_toggles(self):
         """Update checkboxes based on actual staged status."""
-        for section in self.manager.staged_sections:
-            if section.name in self.toggle_vars:
-                self.toggle_vars[section.name].set(True)
-        
-        # Also need to uncheck ones NOT in staged
-        staged_names = [s.name for s in self.manager.staged_sections]
-        for name, var in self.toggle_vars.items():
-            if name not in staged_names:
-                var.set(False)
-
+        staged_names = frozenset(s.name for s in self.manager.staged_sections)
+        sections, tree_set = self.sections, self.tree.set
+        # One pass over the rows whose state changed since the last refresh
+        for name in staged_names ^ self._last_staged:
+            if name in sections:
+                tree_set(name, 'staged', CHECKED if name in staged_names else UNCHECKED)
+        self._last_staged = staged_names
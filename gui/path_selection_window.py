@@ -1,9 +1,17 @@
 import tkinter as tk
 from tkinter import filedialog, ttk
 import os
+import queue
+import threading
 
 from core.pipeline_manager import PipelineConfiguration
 
+# Directory entries handed from the scan thread to the GUI per queue item
+SCAN_BATCH_SIZE = 200
+SCAN_POLL_MS = 50
+# Quiet period before a changed input dir is scanned, so rapid changes scan once
+SCAN_DEBOUNCE_MS = 150
+
 class PathSelectionWindow(tk.Toplevel):
     def __init__(self, parent: tk.Tk, config: PipelineConfiguration):
         super().__init__(parent)
@@ -13,6 +21,15 @@ class PathSelectionWindow(tk.Toplevel):
         self.config = config
         self.on_update = None # Callback function
         
+        # Directory listing runs in a thread; results come back through this queue.
+        # Each scan gets a new generation so results of a superseded scan are dropped.
+        self._scan_queue = queue.Queue()
+        self._scan_gen = 0
+        self._drain_after_id = None
+        self._scan_path = None # Input dir listed (or about to be)
+        self._scan_after_id = None
+        self._update_after_id = None # Pending coalesced on_update call
+        
         self._setup_ui()
         
         # Populate initial values
@@ -21,6 +38,17 @@ class PathSelectionWindow(tk.Toplevel):
     def set_callback(self, callback):
         self.on_update = callback
 
+    def destroy(self):
+        for after_id in (self._drain_after_id, self._scan_after_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self._drain_after_id = self._scan_after_id = None
+        # Don't lose a change made right before closing
+        if self._update_after_id is not None:
+            self.after_cancel(self._update_after_id)
+            self._do_update()
+        super().destroy()
+
     def _setup_ui(self):
         # Input Dir
         frame_in = tk.LabelFrame(self, text="Input Directory (Start)", padx=10, pady=10)
@@ -47,20 +75,12 @@ class PathSelectionWindow(tk.Toplevel):
         preview_frame = tk.LabelFrame(self, text="Input Directory Contents", padx=10, pady=10)
         preview_frame.pack(fill='both', expand=True, padx=10, pady=5)
         
-        # Treeview for file list
-        self.tree = ttk.Treeview(preview_frame, columns=("size",), show='headings')
-        self.tree.heading("size", text="Size")
-        self.tree.column("size", width=100, anchor='e')
-        # We need a primary column for filename, which Treeview has by default as '#0' if show='tree', 
-        # but here we use display columns. Let's make column #0 be the Name.
-        # Actually standard Treeview usage: column #0 is the tree node. 
-        # Let's switch to show='tree headings' or just columns map.
-        # Simpler: One column for Name (tree column) and one for Size.
-        
+        # Treeview for file list: Name in the tree column (#0), plus a Size column
         self.tree = ttk.Treeview(preview_frame, columns=("size",), selectmode='none')
         self.tree.heading("#0", text="Name", anchor='w')
         self.tree.heading("size", text="Size", anchor='e')
         self.tree.column("#0", anchor='w')
+        self.tree.column("size", width=100, anchor='e')
         
         # Scrollbar
         scrollbar = ttk.Scrollbar(preview_frame, orient="vertical", command=self.tree.yview)
@@ -75,48 +95,85 @@ class PathSelectionWindow(tk.Toplevel):
         self.var_input.set(ctx.input_dir)
         self.var_output.set(ctx.output_dir)
         
-        self._populate_file_list(ctx.input_dir)
+        self._schedule_scan(ctx.input_dir)
+
+    def _schedule_scan(self, folder_path):
+        # Output-only changes leave the listing alone
+        if folder_path == self._scan_path:
+            return
+        self._scan_path = folder_path
+        if self._scan_after_id is not None:
+            self.after_cancel(self._scan_after_id)
+        self._scan_after_id = self.after(SCAN_DEBOUNCE_MS, self._run_scheduled_scan)
+
+    def _run_scheduled_scan(self):
+        self._scan_after_id = None
+        self._populate_file_list(self._scan_path)
+
+    def _schedule_update(self):
+        # Several changes in one burst notify the listener once
+        if self.on_update and self._update_after_id is None:
+            self._update_after_id = self.after_idle(self._do_update)
+
+    def _do_update(self):
+        self._update_after_id = None
+        if self.on_update: self.on_update()
 
     def _select_input(self):
         path = filedialog.askdirectory(title="Select Input Directory")
         if path:
             self.config.global_context.input_dir = path
             self._refresh_ui_from_config()
-            if self.on_update: self.on_update()
+            self._schedule_update()
 
     def _clear_input(self):
         self.config.global_context.input_dir = ""
         self._refresh_ui_from_config()
-        if self.on_update: self.on_update()
+        self._schedule_update()
 
     def _select_output(self):
         path = filedialog.askdirectory(title="Select Output Directory")
         if path:
             self.config.global_context.output_dir = path
             self._refresh_ui_from_config()
-            if self.on_update: self.on_update()
+            self._schedule_update()
 
     def _clear_output(self):
         self.config.global_context.output_dir = ""
         self._refresh_ui_from_config()
-        if self.on_update: self.on_update()
+        self._schedule_update()
 
     def _populate_file_list(self, folder_path):
         # Clear existing
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
+        self._scan_gen += 1
             
-        if not folder_path or not os.path.exists(folder_path):
+        if not folder_path:
             return
 
+        # Listing a slow or network drive must not block the GUI
+        threading.Thread(target=self._scan_worker, args=(folder_path, self._scan_gen), daemon=True).start()
+        if self._drain_after_id is None:
+            self._drain_after_id = self.after(SCAN_POLL_MS, self._drain_scan)
+
+    def _scan_worker(self, folder_path, gen):
+        """Runs in a background thread. Puts (gen, rows) batches, then (gen, None) when done."""
+        rows = []
         try:
+            if not os.path.exists(folder_path):
+                return
+
             # Simple non-recursive listing
             for entry in os.scandir(folder_path):
                 # Basic info
                 name = entry.name
                 size_str = ""
-                if entry.is_file():
-                    size = entry.stat().st_size
+                # is_dir/is_file come from readdir for free; only files need a stat() call.
+                # Links are not followed, so each entry costs at most one syscall.
+                if entry.is_dir(follow_symlinks=False):
+                    size_str = "<DIR>"
+                elif entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size
                     # formatting size
                     if size < 1024:
                         size_str = f"{size} B"
@@ -124,12 +181,38 @@ class PathSelectionWindow(tk.Toplevel):
                         size_str = f"{size/1024:.1f} KB"
                     else:
                         size_str = f"{size/(1024*1024):.1f} MB"
-                elif entry.is_dir():
-                    size_str = "<DIR>"
+                elif entry.is_symlink():
+                    size_str = "<LINK>"
                 
-                # Insert
-                # We interpret folders vs files via icons if we had them, or just text
-                self.tree.insert("", "end", text=name, values=(size_str,))
+                rows.append((name, size_str))
+                if len(rows) >= SCAN_BATCH_SIZE:
+                    self._scan_queue.put((gen, rows))
+                    rows = []
                 
         except Exception as e:
             print(f"Error listing directory: {e}")
+        finally:
+            if rows:
+                self._scan_queue.put((gen, rows))
+            self._scan_queue.put((gen, None))
+
+    def _drain_scan(self):
+        """Inserts scanned entries into the tree. Polls until the current scan is done."""
+        self._drain_after_id = None
+        done = False
+        try:
+            while True:
+                gen, rows = self._scan_queue.get_nowait()
+                if gen != self._scan_gen:
+                    continue # Superseded scan
+                if rows is None:
+                    done = True
+                    continue
+                for name, size_str in rows:
+                    # We interpret folders vs files via icons if we had them, or just text
+                    self.tree.insert("", "end", text=name, values=(size_str,))
+        except queue.Empty:
+            pass
+
+        if not done:
+            self._drain_after_id = self.after(SCAN_POLL_MS, self._drain_scan)
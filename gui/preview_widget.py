@@ -11,6 +11,10 @@ class PreviewWidget(tk.Frame):
         super().__init__(parent)
         self.manager = manager
         
+        # What the widgets currently show, so refresh() can skip unchanged parts
+        self._last_rows = []
+        self._last_status = False # Matches the label's initial "Paths Missing"
+        
         self._setup_ui()
 
     def _setup_ui(self):
@@ -33,23 +37,44 @@ class PreviewWidget(tk.Frame):
         self.path_status_lbl.pack(side='bottom', pady=10)
 
     def refresh(self):
-        self.listbox.delete(0, tk.END)
+        # Refreshes can arrive after a move already set the new selection, keep it
+        sel = self.listbox.curselection()
         last_stage_index = -1
         has_warning = False
         
+        section_to_category = self.manager.section_to_category
+        new_rows = []
         for idx, section in enumerate(self.manager.staged_sections):
-            cat = self.manager.get_category_of_section(section)
+            cat = section_to_category.get(id(section))
             cat_name = cat.name if cat else "?"
             
             # Simple Display
-            self.listbox.insert(tk.END, f"{idx+1}. [{cat_name}] {section.name}")
+            new_rows.append(f"{idx+1}. [{cat_name}] {section.name}")
+
+        # Only rewrite the rows after the first difference
+        common = 0
+        for old_row, new_row in zip(self._last_rows, new_rows):
+            if old_row != new_row:
+                break
+            common += 1
+        if common < len(self._last_rows):
+            self.listbox.delete(common, tk.END)
+        if common < len(new_rows):
+            self.listbox.insert(tk.END, *new_rows[common:])
+        self._last_rows = new_rows
+
+        if sel and sel[0] < self.listbox.size():
+            self.listbox.selection_set(sel[0])
             
         # Update Path Status
         ctx = self.manager.config.global_context
-        if ctx.input_dir and ctx.output_dir:
-            self.path_status_lbl.config(text="Paths Configured", fg="green")
-        else:
-            self.path_status_lbl.config(text="Paths Missing", fg="red")
+        status = bool(ctx.input_dir and ctx.output_dir)
+        if status != self._last_status:
+            self._last_status = status
+            if status:
+                self.path_status_lbl.config(text="Paths Configured", fg="green")
+            else:
+                self.path_status_lbl.config(text="Paths Missing", fg="red")
             
     def _move_up(self):
         sel = self.listbox.curselection()
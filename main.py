@@ -1,5 +1,4 @@
 import tkinter as tk
-import queue
 import sys
 import os
 
@@ -7,7 +6,9 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from core.state_models import PipelineConfiguration
+from core.log_queue import LogQueue
 from core.executor import AsyncExecutor
+from core.worker_pool import ScriptWorkerPool
 from core.pipeline_manager import PipelineManager
 from core.category import PipelineCategory, SelectionMode
 from gui.app_window import AppWindow
@@ -20,10 +21,11 @@ from sections.extract_frames_section import ExtractFramesSection
 from sections.deduplicate_section import DeduplicateSection
 
 def main():
-    output_queue = queue.Queue()
+    output_queue = LogQueue()
     config = PipelineConfiguration()
     executor = AsyncExecutor(output_queue)
-    manager = PipelineManager(config, executor)
+    worker_pool = ScriptWorkerPool(output_queue)
+    manager = PipelineManager(config, executor, worker_pool)
     
     # --- Define Categories & Sections ---
     
@@ -46,10 +48,13 @@ def main():
     manager.add_category(cat_train)
     
     # --- Launch ---
+    # Warm up the script worker (cv2/numpy imports) while the user sets things up
+    worker_pool.start()
     app = AppWindow(manager, executor, output_queue)
     
     def on_close():
         executor.stop()
+        worker_pool.shutdown()
         app.destroy()
         
     app.protocol("WM_DELETE_WINDOW", on_close)
@@ -5,10 +5,38 @@ import os
 import subprocess
 import argparse
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from functools import lru_cache
 from config import get_env_executable
+from pipeline.streaming import run_streamed, log
+from scripts._image_io import is_image_name
+
+# Datasets with more images than this count as large: exhaustive O(N^2) matching is replaced
+# by vocab tree matching (O(N*k)) and the COLMAP mapper defaults to its fast preset
+LARGE_DATASET_IMAGES = 1000
+
+# Bounded matching so large datasets degrade gracefully instead of running out of GPU memory
+MATCHING_OPTIONS = {
+    "use_gpu": True,
+    "max_num_matches": 32768,
+}
+
+@lru_cache(maxsize=None)
+def _gpu_indices():
+  '''
+  comma-separated indices of all visible NVIDIA GPUs (e.g. "0,1"), or "-1" (COLMAP's default,
+  a single GPU) when there is at most one or nvidia-smi is unavailable
+  '''
+  try:
+    out = subprocess.run(["nvidia-smi", "-L"], capture_output=True, text=True, timeout=10).stdout
+  except (OSError, subprocess.SubprocessError):
+    return "-1"
+  count = sum(1 for line in out.splitlines() if line.startswith("GPU "))
+  return ",".join(map(str, range(count))) if count > 1 else "-1"
 
 class BaseReconstruction(ABC):
-  def __init__(self, input_dir, output_dir, camera_model="PINHOLE"):
+  def __init__(self, input_dir, output_dir, camera_model="PINHOLE", output_queue=None):
     '''
     Remove defaults once GUI is implemented
     Add GPU?
@@ -22,10 +50,13 @@ class BaseReconstruction(ABC):
     self.camera_model = camera_model
     self.database_path = self.output_dir / "database.db"
     self.sparse_dir = self.output_dir / "sparse"
+    # GLOMAP / FASTMAP CLI output and errors go here (e.g. the GUI LogQueue); printed when None
+    self.output_queue = output_queue
 
   def extract_matchFeatures(self):
     '''
-    extracts and matches features from images using command line from colmap
+    extracts and matches features from images in-process through pycolmap
+    (one database handle and GPU context for both, instead of one colmap CLI process each)
     Args:
       input_dir: directory containing images
       output_dir: directory to store results
@@ -33,27 +64,40 @@ class BaseReconstruction(ABC):
     Returns:
       nothing ? The extraction/matching is stored in the db?
     '''
-    colmap_exe = get_env_executable("COLMAP")
   # Feature extraction
-    feature_cmd = [
-        colmap_exe, "feature_extractor",
-        "--database_path", str(self.database_path),
-        "--image_path", str(self.input_dir),
-        "--ImageReader.camera_model", self.camera_model,
-        "--ImageReader.single_camera", "1",
-    ]
-    # run the feature extraction
-    subprocess.run(feature_cmd, check=True)
+    # With several GPU indices COLMAP runs one SIFT extractor per GPU over a shared reader
+    # and database writer, so extraction is split across all GPUs within this one call
+    gpu_index = _gpu_indices()
+    pycolmap.extract_features(
+        self.database_path,
+        self.input_dir,
+        camera_mode=pycolmap.CameraMode.SINGLE,
+        camera_model=self.camera_model,
+        extraction_options=pycolmap.FeatureExtractionOptions(gpu_index=gpu_index),
+    )
 
     # Feature matching
-    matching_cmd = [
-        colmap_exe, "exhaustive_matcher",
-        "--database_path", str(self.database_path),
-    ]
-    # run the feature matching
-    subprocess.run(matching_cmd, check=True)
-
-    pass
+    matching_options = pycolmap.FeatureMatchingOptions(**MATCHING_OPTIONS, gpu_index=gpu_index)
+    if self._has_more_images_than(LARGE_DATASET_IMAGES):
+      pycolmap.match_vocabtree(
+          self.database_path,
+          matching_options=matching_options,
+          pairing_options=pycolmap.VocabTreePairingOptions(num_images=100, num_nearest_neighbors=5),
+      )
+    else:
+      pycolmap.match_exhaustive(
+          self.database_path,
+          matching_options=matching_options,
+          pairing_options=pycolmap.ExhaustivePairingOptions(block_size=50),
+      )
+
+  def _has_more_images_than(self, count):
+    '''
+    True if input_dir holds more than count images. Stops scanning once past count.
+    '''
+    with os.scandir(self.input_dir) as entries:
+      images = (e for e in entries if is_image_name(e.name))
+      return sum(1 for _ in islice(images, count + 1)) > count
 
   def find_reconstruction(self):
     '''
@@ -83,20 +127,37 @@ class COLMAP_Mapper(BaseReconstruction):
     '''
     runs the COLMAP mapping portion
     '''
+    # Fewer and shorter global bundle adjustment passes, which dominate mapper runtime
+    FAST_MAPPER_OPTIONS = {
+        "ba_global_frames_ratio": 1.32,
+        "ba_global_points_ratio": 1.32,
+        "ba_global_max_num_iterations": 10,
+        "ba_global_max_refinements": 1,
+        "ba_local_max_num_iterations": 10,
+    }
+
+    def __init__(self, input_dir, output_dir, camera_model="PINHOLE", preset=None, output_queue=None):
+        '''
+        preset: "fast", "standard", or None to use "fast" on large datasets only
+        '''
+        super().__init__(input_dir, output_dir, camera_model, output_queue)
+        self.preset = preset
 
     def perform_mapping(self):
         '''
-        runs the COLMAP mapping portion
+        runs the COLMAP mapping portion (in-process, through pycolmap)
         '''
-        colmap_exe = get_env_executable("COLMAP")
-        mapper_cmd = [
-            colmap_exe, "mapper",
-            "--database_path", str(self.database_path),
-            "--image_path", str(self.input_dir),
-            "--output_path", str(self.sparse_dir),
-        ]
-        
-        subprocess.run(mapper_cmd, check=True)
+        options = pycolmap.IncrementalPipelineOptions()
+        preset = self.preset
+        if preset is None:
+            preset = "fast" if self._has_more_images_than(LARGE_DATASET_IMAGES) else "standard"
+        if preset == "fast":
+            for name, value in self.FAST_MAPPER_OPTIONS.items():
+                setattr(options, name, value)
+
+        # The CLI mapper expects an existing output folder; keep that contract
+        self.sparse_dir.mkdir(parents=True, exist_ok=True)
+        pycolmap.incremental_mapping(self.database_path, self.input_dir, self.sparse_dir, options=options)
 
     pass
         
@@ -115,9 +176,9 @@ class GLOMAP_Mapper(BaseReconstruction):
         ]
 
         try:
-            subprocess.run(cmd, check=True)
+            run_streamed(cmd, self.output_queue)
         except subprocess.CalledProcessError as e:
-            print(f"Error running GLOMAP: {e}")
+            log(f"Error running GLOMAP: {e}", self.output_queue)
 
         pass
 
@@ -136,12 +197,43 @@ class FASTMAP_Mapper(BaseReconstruction):
         ]
 
         try:
-            subprocess.run(cmd, check=True)
+            run_streamed(cmd, self.output_queue)
         except subprocess.CalledProcessError as e:
-            print(f"Error running FASTMAP: {e}")
+            log(f"Error running FASTMAP: {e}", self.output_queue)
 
         pass
 
+def run_pipelined(reconstructions):
+    '''
+    runs several reconstructions (datasets / quality levels) as a two-stage pipeline:
+    extraction + matching of the next one overlaps mapping of the previous one.
+    Each stage handles one reconstruction at a time (extraction is GPU-bound, mapping CPU-bound),
+    so total time approaches max(extract + match, map) per dataset instead of the sum.
+    A failed extraction skips that dataset's mapping; the first error is raised at the end.
+    '''
+    errors = []
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="extract") as extract_stage, \
+         ThreadPoolExecutor(max_workers=1, thread_name_prefix="mapping") as mapping_stage:
+        # Extractions queue up back to back; each mapping starts as soon as its extraction is done
+        extractions = [extract_stage.submit(r.extract_matchFeatures) for r in reconstructions]
+        mappings = []
+        for reconstruction, extraction in zip(reconstructions, extractions):
+            try:
+                extraction.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            mappings.append(mapping_stage.submit(reconstruction.perform_mapping))
+
+        for mapping in mappings:
+            try:
+                mapping.result()
+            except Exception as e:
+                errors.append(e)
+
+    if errors:
+        raise errors[0]
+
 class LiMap:
     '''
     Will implement at some later point. Detects features and edges to map
@@ -0,0 +1,43 @@
+import subprocess
+import threading
+
+def log(message, output_queue=None):
+  '''
+  puts one line on output_queue (e.g. the GUI LogQueue), or prints it when None
+  '''
+  if output_queue is not None:
+    output_queue.put(message + "\n")
+  else:
+    print(message)
+
+def run_streamed(cmd, output_queue=None):
+  '''
+  runs cmd like subprocess.run(cmd, check=True), but forwards its output line by line
+  as it is produced instead of buffering all of it until the process exits
+  Args:
+    cmd: command list
+    output_queue: queue to put lines on (e.g. the GUI LogQueue); printed when None
+  Raises:
+    subprocess.CalledProcessError on a non-zero exit code
+  '''
+  proc = subprocess.Popen(
+      cmd,
+      stdout=subprocess.PIPE,
+      stderr=subprocess.STDOUT,
+      text=True,
+      bufsize=1,
+      errors="replace"
+  )
+
+  def forward():
+    for line in proc.stdout:
+      log(line.rstrip("\n"), output_queue)
+    proc.stdout.close()
+
+  reader = threading.Thread(target=forward, daemon=True)
+  reader.start()
+  return_code = proc.wait()
+  reader.join()
+
+  if return_code:
+    raise subprocess.CalledProcessError(return_code, cmd)
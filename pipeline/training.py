@@ -2,14 +2,17 @@ from abc import ABC, abstractmethod
 import subprocess
 import os
 from config import get_env_executable
+from pipeline.streaming import run_streamed, log
+from core.paths import SCRIPTS_DIR
 
 # TODO: Set this to the actual path of the training script
-train_py_path = os.path.abspath("scripts/FastGS/train.py")
+train_py_path = os.path.join(SCRIPTS_DIR, "FastGS", "train.py")
 
 class Training(ABC):
-    def __init__(self, sparse_dir, model_dir):
+    def __init__(self, sparse_dir, model_dir, output_queue=None):
         self.sparse_dir = sparse_dir
         self.model_dir = model_dir
+        self.output_queue = output_queue
         self.quality = "standard" # Default quality
         pass
 
@@ -62,9 +65,9 @@ class FastGS(Training):
                 "--loss_thresh", "0.0005"
             ]
         try:
-            subprocess.run(cmd, check=True)
+            run_streamed(cmd, self.output_queue)
         except subprocess.CalledProcessError as e:
-            print(f"Error: {e}")
+            log(f"Error: {e}", self.output_queue)
 
 
 
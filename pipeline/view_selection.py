@@ -1,29 +1,29 @@
 import subprocess
+import os
 from config import get_env_executable
+from pipeline.streaming import run_streamed, log
+from core.paths import SCRIPTS_DIR
 
 class TrajSelection:
     '''
     routes out to Indoor Traj Frame Selection so GUI can interact
     '''
-    def __init__(self, input_dir, output_dir):
+    def __init__(self, input_dir, output_dir, output_queue=None):
         self.input_dir = input_dir
         self.output_dir = output_dir
+        self.output_queue = output_queue
         pass
     def run(self):
         # We might want to use a specific python environment for this too
         python_exe = get_env_executable("IndoorTraj")
-        script_path = "scripts/IndoorTraj/main.py" # Adjusted path
+        script_path = os.path.join(SCRIPTS_DIR, "IndoorTraj", "main.py")
 
         command = [python_exe, script_path, "--input-dir", self.input_dir, "--out-dir", self.output_dir]
 
         try:
-            subprocess.run(
-                command,
-                check=True,
-                capture_output=True,
-                text=True
-            )
+            # Streamed so progress shows up while it runs and memory stays bounded
+            run_streamed(command, self.output_queue)
         except subprocess.CalledProcessError as e:
-            print(f"Error running Indoor Traj Frame Selection: {e}")
+            log(f"Error running Indoor Traj Frame Selection: {e}", self.output_queue)
 
     pass
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Image file helpers shared by the frame filtering scripts (blur_filter, deduplicate) and their pipeline sections."""
+import os
+import shutil
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+# Common spellings, matched by one C-level endswith without lowercasing each name
+_IMAGE_EXTENSIONS_CASED = IMAGE_EXTENSIONS + tuple(ext.upper() for ext in IMAGE_EXTENSIONS)
+
+def is_image_name(name):
+    # Mixed-case names (".Jpg") are rare and take the slower lowercasing path
+    return name.endswith(_IMAGE_EXTENSIONS_CASED) or name.lower().endswith(IMAGE_EXTENSIONS)
+
+def has_image(filenames):
+    """True if any of the names has an image extension. Stops at the first match."""
+    return any(map(is_image_name, filenames))
+
+def list_images(directory):
+    """Sorted paths of the images directly inside directory, from a single scandir pass."""
+    with os.scandir(directory) as entries:
+        return sorted(e.path for e in entries if is_image_name(e.name) and e.is_file())
+
+def image_directories(source_dir, topmost=False):
+    """
+    Directories under source_dir (itself included, first) that directly contain images,
+    from a single top-down walk. With topmost, nothing below an already found directory is listed.
+    """
+    found = []
+    for root, dirs, files in os.walk(source_dir):
+        if has_image(files):
+            found.append(root)
+            if topmost:
+                dirs[:] = [] # Don't descend, root covers its sub-directories
+    return found
+
+def fast_copy(src, dest):
+    """
+    Hardlinks src to dest when both are on the same filesystem, so no bytes are copied.
+    Otherwise copies the contents only (shutil.copyfile uses sendfile/copy_file_range on Linux);
+    the metadata copy2 would add is not needed for frames.
+    """
+    try:
+        os.link(src, dest)
+    except OSError:
+        # Re-runs: dest may already be a link to src
+        if os.path.exists(dest) and os.path.samefile(src, dest):
+            return
+        shutil.copyfile(src, dest)
+
+# Decode-time downscaling: libjpeg scales JPEGs by 1/2, 1/4 or 1/8 inside the IDCT,
+# far cheaper than a full decode followed by cv2.resize. Largest factor first.
+_REDUCED_SCALES = (8, 4, 2)
+
+def reduced_read_flag(sample_path, min_width):
+    """
+    cv2.imread flag that decodes at the smallest scale still at least min_width wide.
+    Frames in one directory share a resolution, so one sample decides for all of them.
+    """
+    import cv2 # Imported where needed; the file helpers above don't need it
+    if not min_width:
+        return cv2.IMREAD_GRAYSCALE
+    sample = cv2.imread(sample_path, cv2.IMREAD_GRAYSCALE)
+    if sample is None:
+        return cv2.IMREAD_GRAYSCALE
+    width = sample.shape[1]
+    for factor in _REDUCED_SCALES:
+        if width // factor >= min_width:
+            return getattr(cv2, f"IMREAD_REDUCED_GRAYSCALE_{factor}")
+    return cv2.IMREAD_GRAYSCALE
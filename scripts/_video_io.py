@@ -0,0 +1,13 @@
+"""Video file helpers shared by extract_frames and its pipeline section."""
+import os
+
+# Supported video extensions
+VIDEO_EXTENSIONS = frozenset(('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv'))
+
+def list_videos(directory):
+    """Sorted paths of the videos directly inside directory, from one listing matched case-insensitively."""
+    with os.scandir(directory) as entries:
+        return sorted(
+            e.path for e in entries
+            if os.path.splitext(e.name)[1].lower() in VIDEO_EXTENSIONS and e.is_file()
+        )
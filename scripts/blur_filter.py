@@ -1,13 +1,33 @@
 import os
-import shutil
 import cv2
 import numpy as np
 import multiprocessing
-from glob import glob
 import argparse
+from functools import partial
+from _image_io import image_directories, list_images, fast_copy, reduced_read_flag
+
+def _variance_of_laplacian(image):
+    """Compute the Laplacian variance as a sharpness metric."""
+    # float32 is plenty for ranking frames and faster than float64.
+    # meanStdDev is a single SIMD pass (population std, so std**2 equals ndarray.var())
+    _, std = cv2.meanStdDev(cv2.Laplacian(image, cv2.CV_32F, ksize=3))
+    return float(std[0, 0]) ** 2
+
+def _score_image(img_path, resize_width=None, read_flag=cv2.IMREAD_GRAYSCALE):
+    """Pool worker: returns (score, path), or None if the image can't be read."""
+    # Decoding straight to grayscale (and, for JPEGs, to a reduced scale) skips the colour conversion
+    img = cv2.imread(img_path, read_flag)
+    if img is None:
+        return None
+    h, w = img.shape
+    if resize_width and w > resize_width:
+        # Relative sharpness survives downscaling; the Laplacian then runs on far fewer pixels
+        scale = resize_width / float(w)
+        img = cv2.resize(img, (resize_width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    return (_variance_of_laplacian(img), img_path)
 
 class BlurFilter:
-    def __init__(self, source_dir, output_dir, target_count=None, target_percentage=0.95, groups=None, scalar=None, dry_run=False):
+    def __init__(self, source_dir, output_dir, target_count=None, target_percentage=0.95, groups=None, scalar=None, dry_run=False, score_resize_width=512, threads=None):
         """
         Initialize the BlurFilter.
         
@@ -18,6 +38,8 @@ class BlurFilter:
             target_percentage (float): Percentage of images to keep (0.0 to 1.0).
             groups (int): Number of groups to split the timeline into.
             dry_run (bool): If True, simulate actions.
+            score_resize_width (int): Width images are downscaled to before scoring (0 = full resolution).
+            threads (int): Processes scoring images in parallel (default: CPU count).
         """
 
         self.source_dir = source_dir
@@ -27,70 +49,37 @@ class BlurFilter:
         self.groups = groups
         self.scalar = scalar
         self.dry_run = dry_run
+        self.score_resize_width = score_resize_width
+        self.threads = max(1, int(threads)) if threads else (os.cpu_count() or 1)
         
         if self.output_dir and not os.path.exists(self.output_dir):
             if not self.dry_run:
                 os.makedirs(self.output_dir)
 
-    def _variance_of_laplacian(self, image):
-        """Compute the Laplacian variance as a sharpness metric."""
-        return cv2.Laplacian(image, cv2.CV_64F).var()
-
     def _distribute_evenly(self, total: int, num_groups: int) -> list[int]:
         """
         Helper to distribute images/slots evenly across groups.
-        Deals with floating point errors by incrementing the first few groups.
+        Group sizes differ by at most one and always sum to total.
         """
-        ideal_per_group = total / num_groups
-        if ideal_per_group < 1:
+        if num_groups <= 0 or num_groups > total:
             raise ValueError("Number of groups must be less than the total number of images.")
-        accumulated_error = 0.0
-        distribution = [0] * num_groups
-
-        for i in range(num_groups):
-            distribution[i] = int(ideal_per_group)
-            accumulated_error += ideal_per_group - distribution[i]
-
-            while accumulated_error >= 1.0:
-                distribution[i] += 1
-                accumulated_error -= 1.0
-
-        return distribution
+        # Rounded group boundaries; their differences are the group sizes
+        bounds = np.round(np.linspace(0, total, num_groups + 1)).astype(np.int64)
+        return np.diff(bounds).tolist()
 
     def _find_image_directories(self):
         """
-        Scans source_dir for directories containing images.
+        Scans source_dir (itself included) for directories containing images.
         Returns a list of (input_dir, output_dir) tuples.
         """
         image_dirs = []
-        extensions = {'.jpg', '.jpeg', '.png'}
         
-        # Check if source_dir itself has images (Single Mode)
-        has_images = False
-        for fname in os.listdir(self.source_dir):
-            if os.path.splitext(fname)[1].lower() in extensions:
-                has_images = True
-                break
-        
-        if has_images:
-            image_dirs.append((self.source_dir, self.output_dir))
-        
-        # Check subdirectories (Batch Mode)
-        # We walk top-down. If we find a directory with images, we add it.
-        # Note: This simple logic assumes either root has images OR subdirs have images, 
-        # but robust code handles mixed.
-        for root, dirs, files in os.walk(self.source_dir):
-            if root == self.source_dir and has_images:
-                continue # Already added
-                
-            # Check if this dir has images
-            dir_has_images = any(os.path.splitext(f)[1].lower() in extensions for f in files)
-            
-            if dir_has_images:
-                # Construct relative path
-                rel_path = os.path.relpath(root, self.source_dir)
-                out_path = os.path.join(self.output_dir, rel_path)
-                image_dirs.append((root, out_path))
+        # source_dir itself (Single Mode) comes first, then any subdirectories with images (Batch Mode)
+        for root in image_directories(self.source_dir):
+            # Construct relative path
+            rel_path = os.path.relpath(root, self.source_dir)
+            out_path = os.path.normpath(os.path.join(self.output_dir, rel_path))
+            image_dirs.append((root, out_path))
                 
         return image_dirs
 
@@ -121,14 +110,7 @@ class BlurFilter:
         
     def _process_directory(self, source_dir, output_dir):
         # 1. Gather Images
-        extensions = ['*.jpg', '*.jpeg', '*.png']
-        images = []
-        for ext in extensions:
-            images.extend(glob(os.path.join(source_dir, ext)))
-            images.extend(glob(os.path.join(source_dir, ext.upper())))
-        
-        unique_images_dict = {os.path.normcase(path): path for path in images}
-        final_images = sorted(unique_images_dict.values())
+        final_images = list_images(source_dir)
         total_images = len(final_images)
         
         if total_images == 0:
@@ -154,14 +136,17 @@ class BlurFilter:
         print(f"  {total_images} images. Keeping {current_target_count} (Groups: {current_groups}).")
 
         # 4. Calculate Sharpness Scores
-        image_scores = []
+        # Scored in parallel; imap keeps the timeline order the grouping below relies on
         # print("  Calculating scores...") 
-        for img_path in final_images:
-            img = cv2.imread(img_path)
-            if img is None: continue
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            score = self._variance_of_laplacian(gray)
-            image_scores.append((score, img_path))
+        read_flag = reduced_read_flag(final_images[0], self.score_resize_width)
+        score = partial(_score_image, resize_width=self.score_resize_width, read_flag=read_flag)
+        if self.threads > 1:
+            with multiprocessing.Pool(processes=self.threads) as pool:
+                results = pool.imap(score, final_images, chunksize=16)
+                image_scores = [result for result in results if result is not None]
+        else:
+            # A budget of one core (e.g. one of many shards) isn't worth a pool process
+            image_scores = [result for result in map(score, final_images) if result is not None]
         
         # 5. Group and Select
         if current_groups > total_images:
@@ -171,19 +156,23 @@ class BlurFilter:
         group_sizes = self._distribute_evenly(total_images, current_groups)
         keep_per_group = self._distribute_evenly(current_target_count, current_groups)
         
-        selected_images = set()
+        # Selection is a mask over the scored (timeline-ordered) images rather than a set of paths
+        scored_paths = [path for _, path in image_scores]
+        scores = np.fromiter((score for score, _ in image_scores), dtype=np.float32, count=len(image_scores))
+        selected_mask = np.zeros(len(scored_paths), dtype=bool)
         offset = 0
         
         for idx, size in enumerate(group_sizes):
             end_idx = offset + size
-            chunk = image_scores[offset:end_idx]
-            chunk_sorted = sorted(chunk, key=lambda x: x[0], reverse=True)
+            chunk = scores[offset:end_idx]
             
             n_to_keep = keep_per_group[idx]
-            kept_chunk = chunk_sorted[:n_to_keep]
-            
-            for _, path in kept_chunk:
-                selected_images.add(path)
+            if n_to_keep >= len(chunk):
+                selected_mask[offset:end_idx] = True
+            elif n_to_keep > 0:
+                # O(g) top-k selection; the order among the kept frames doesn't matter
+                top = np.argpartition(-chunk, n_to_keep - 1)[:n_to_keep]
+                selected_mask[offset + top] = True
             offset = end_idx
 
         # 6. Output Selection
@@ -191,7 +180,10 @@ class BlurFilter:
             return 0
 
         copied_count = 0
-        for path in selected_images:
+        # Timeline order, so the copies read the source directory sequentially
+        for path, selected in zip(scored_paths, selected_mask):
+            if not selected:
+                continue
             filename = os.path.basename(path)
             dest = os.path.join(output_dir, filename)
             copied_count += 1
@@ -201,13 +193,13 @@ class BlurFilter:
                 pass
             else:
                 try:
-                    shutil.copy2(path, dest)
+                    fast_copy(path, dest)
                 except Exception as e:
                     print(f"Error copying {filename}: {e}")
                     
         return copied_count
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Blur Filter Script")
     parser.add_argument("--input_dir", required=True, help="Path to input directory")
     parser.add_argument("--output_dir", required=True, help="Path to output directory")
@@ -216,8 +208,10 @@ if __name__ == "__main__":
     parser.add_argument("--groups", type=int, default=None, help="Number of groups")
     parser.add_argument("--scalar", type=int, default=1, help="Scalar value")
     parser.add_argument("--dry_run", action="store_true", help="Run without copying files")
+    parser.add_argument("--score_resize_width", type=int, default=512, help="Width to resize images to for scoring (0 = full resolution)")
+    parser.add_argument("--threads", type=int, default=None, help="Processes scoring images in parallel (default: CPU count)")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Handle 'None' passed strings from some CLI builders if necessary, but argparse handles types well.
     # Just initiate directly
@@ -228,6 +222,11 @@ if __name__ == "__main__":
         target_percentage=args.keep_percent,
         groups=args.groups,
         scalar=args.scalar,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        score_resize_width=args.score_resize_width,
+        threads=args.threads
     )
     blur_filter.run()
+
+if __name__ == "__main__":
+    main()
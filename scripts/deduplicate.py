@@ -3,10 +3,27 @@ import shutil
 import cv2
 import numpy as np
 import multiprocessing
-from skimage.metrics import structural_similarity as ssim
-from glob import glob
 import time
 import argparse
+import hashlib
+from _image_io import image_directories, list_images, fast_copy, reduced_read_flag
+
+try:
+    import xxhash # Optional, several times faster than blake2b for content hashing
+except ImportError:
+    xxhash = None
+
+# dHash: one bit per horizontal neighbour comparison on a 9x8 thumbnail
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+def _file_digest(path):
+    """Digest of the file's bytes, used to spot byte-identical frames without decoding them."""
+    hasher = xxhash.xxh3_64() if xxhash is not None else hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            hasher.update(chunk)
+    return hasher.digest()
 
 class FrameDeduplicator:
     def __init__(self, source_dir, output_dir=None, threshold=0.92, resize_width=512, dry_run=False):
@@ -17,7 +34,7 @@ class FrameDeduplicator:
             source_dir (str): Path to the directory containing image frames.
             output_dir (str): Optional. If provided, UNIQUE frames are copied here. 
                               If None, DUPLICATES are moved to source_dir/duplicates.
-            threshold (float): SSIM threshold. 
+            threshold (float): Similarity threshold (share of matching dHash bits, 0.0 to 1.0).
                                >= Threshold implies duplicate (discard).
                                < Threshold implies new content (keep/pivot).
             resize_width (int): Width to resize images to for comparison (optimization).
@@ -28,82 +45,73 @@ class FrameDeduplicator:
         self.threshold = threshold
         self.resize_width = resize_width
         self.dry_run = dry_run
+        # Set per directory from a sample frame (see reduced_read_flag)
+        self.read_flag = cv2.IMREAD_GRAYSCALE
+        # Max differing hash bits for two frames to still count as duplicates
+        self.max_hash_distance = int((1.0 - threshold) * HASH_BITS)
 
     def _find_image_directories(self):
         """
-        Scans source_dir for directories containing images.
+        Scans source_dir (itself included) for directories containing images.
         Returns a list of (input_dir, output_dir, relative_path) tuples.
         """
         image_dirs = []
-        extensions = {'.jpg', '.jpeg', '.png'}
         
-        has_images = False
-        for fname in os.listdir(self.source_dir):
-            if os.path.splitext(fname)[1].lower() in extensions:
-                has_images = True
-                break
-        
-        if has_images:
-            # Root
-            out_d = self.output_dir if self.output_dir else self.source_dir
-            image_dirs.append((self.source_dir, out_d, "."))
-        
-        for root, dirs, files in os.walk(self.source_dir):
-            if root == self.source_dir and has_images:
-                continue
-                
-            dir_has_images = any(os.path.splitext(f)[1].lower() in extensions for f in files)
-            
-            if dir_has_images:
-                rel_path = os.path.relpath(root, self.source_dir)
-                if self.output_dir:
-                    out_d = os.path.join(self.output_dir, rel_path)
-                else:
-                    out_d = root
-                image_dirs.append((root, out_d, rel_path))
+        # source_dir itself comes first with rel_path "."
+        for root in image_directories(self.source_dir):
+            rel_path = os.path.relpath(root, self.source_dir)
+            if self.output_dir:
+                out_d = os.path.normpath(os.path.join(self.output_dir, rel_path))
+            else:
+                out_d = root
+            image_dirs.append((root, out_d, rel_path))
                 
         return image_dirs
 
-    # _load_and_preprocess and _calculate_similarity remain unchanged
     def _load_and_preprocess(self, image_path):
-        img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        img = cv2.imread(image_path, self.read_flag)
         if img is None: return None
         h, w = img.shape
         scale = self.resize_width / float(w)
         new_h = int(h * scale)
         return cv2.resize(img, (self.resize_width, new_h), interpolation=cv2.INTER_AREA)
 
-    def _calculate_similarity(self, img_a, img_b):
-        score, _ = ssim(img_a, img_b, full=True, data_range=255)
-        return score
+    def _hash_image(self, image_path):
+        """64-bit difference hash (dHash) of the image, or None if it can't be read."""
+        img = self._load_and_preprocess(image_path)
+        if img is None: return None
+        small = cv2.resize(img, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+        bits = small[:, 1:] > small[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def _is_duplicate(self, hash_a, hash_b):
+        # Hamming distance: one XOR and a popcount instead of a full SSIM pass
+        return (hash_a ^ hash_b).bit_count() <= self.max_hash_distance
 
-    def _process_chunk(self, file_chunk):
+    def _find_duplicates(self, files, hashes):
+        """
+        Pivot walk over precomputed hashes (hashes[i] belongs to files[i]).
+        Runs over the whole directory in one pass, so duplicates are found across the full sequence.
+        """
         duplicates_found = []
-        if not file_chunk:
+        if not files:
             return duplicates_found
 
-        pivot_path = file_chunk[0]
-        pivot_img = self._load_and_preprocess(pivot_path)
+        pivot_path = files[0]
+        pivot_hash = hashes[0]
 
-        for current_path in file_chunk[1:]:
-            current_img = self._load_and_preprocess(current_path)
-            
-            if pivot_img is None or current_img is None:
+        for current_path, current_hash in zip(files[1:], hashes[1:]):
+            if pivot_hash is None or current_hash is None:
                 continue
 
-            score = self._calculate_similarity(pivot_img, current_img)
-
-            if score >= self.threshold:
+            if self._is_duplicate(pivot_hash, current_hash):
                 duplicates_found.append(current_path)
             else:
                 pivot_path = current_path
-                pivot_img = current_img
+                pivot_hash = current_hash
                 
         return duplicates_found
         
-    def _process_chunk_wrapper(self, chunk):
-        return self._process_chunk(chunk)
-
     def run(self):
         print(f"--- Starting Deduplication on {self.source_dir} ---")
         if self.output_dir:
@@ -127,25 +135,29 @@ class FrameDeduplicator:
             print(f"Processing: {rel_path} ({in_dir})")
             
             # Gather files
-            all_files = sorted(glob(os.path.join(in_dir, "*.jpg"))) + \
-                        sorted(glob(os.path.join(in_dir, "*.png")))
+            all_files = list_images(in_dir)
             
             n_files = len(all_files)
             if n_files == 0: continue
             total_files += n_files
             
-            # Parallel Execution
-            cpu_count = multiprocessing.cpu_count()
-            chunk_size = int(np.ceil(n_files / cpu_count))
-            # Ensure at least 1 chunk
-            if chunk_size < 1: chunk_size = 1
-            
-            chunks = [all_files[i:i + chunk_size] for i in range(0, n_files, chunk_size)]
+            self.read_flag = reduced_read_flag(all_files[0], self.resize_width)
+
+            # Phase 1 (parallel): decode + hash every frame exactly once. Hashes are plain ints,
+            # so handing them back costs nothing compared to shipping image arrays.
+            # Byte-identical frames (held scenes) are found first from the raw file contents
+            # and reuse the dHash of their first copy instead of being decoded again.
+            with multiprocessing.Pool(processes=multiprocessing.cpu_count()) as pool:
+                digests = pool.map(_file_digest, all_files, chunksize=16)
+                first_copy = {}
+                source_index = [first_copy.setdefault(digest, i) for i, digest in enumerate(digests)]
+                unique_indices = list(first_copy.values())
+                unique_hashes = pool.map(self._hash_image, [all_files[i] for i in unique_indices], chunksize=16)
+            hash_by_index = dict(zip(unique_indices, unique_hashes))
+            hashes = [hash_by_index[i] for i in source_index]
             
-            with multiprocessing.Pool(processes=cpu_count) as pool:
-                results = pool.map(self._process_chunk_wrapper, chunks)
-                
-            dir_duplicates = [item for sublist in results for item in sublist]
+            # Phase 2 (serial): each pivot depends on the previous one, but this is just int compares
+            dir_duplicates = self._find_duplicates(all_files, hashes)
             dir_duplicates_set = set(dir_duplicates)
             
             total_dupes += len(dir_duplicates)
@@ -163,7 +175,7 @@ class FrameDeduplicator:
                         fname = os.path.basename(fpath)
                         dest = os.path.join(out_dir, fname)
                         if not self.dry_run:
-                            shutil.copy2(fpath, dest)
+                            fast_copy(fpath, dest)
             else:
                 # MOVE DUPLICATES (In-Place)
                 duplicates_dir = os.path.join(in_dir, "duplicates")
@@ -186,15 +198,15 @@ class FrameDeduplicator:
         print(f"Kept:         {kept} ({rate:.2f}%)")
         print("-" * 30)
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Frame Deduplication Script")
     parser.add_argument("--input_dir", required=True, help="Path to input directory")
     parser.add_argument("--output_dir", default=None, help="Optional output directory for unique frames")
-    parser.add_argument("--threshold", type=float, default=0.92, help="SSIM Threshold (default 0.92)")
-    parser.add_argument("--resize_width", type=int, default=512, help="Width to resize images for comparison")
+    parser.add_argument("--threshold", type=float, default=0.92, help="Similarity threshold, share of matching hash bits (default 0.92)")
+    parser.add_argument("--resize_width", type=int, default=512, help="Width to resize images to before hashing")
     parser.add_argument("--dry_run", action="store_true", help="Run without changes")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     deduplicator = FrameDeduplicator(
         source_dir=args.input_dir,
@@ -204,3 +216,6 @@ if __name__ == "__main__":
         dry_run=args.dry_run
     )
     deduplicator.run()
+
+if __name__ == "__main__":
+    main()
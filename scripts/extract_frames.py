@@ -1,11 +1,28 @@
 import os
-import cv2
+import re
 import argparse
-from glob import glob
+import shutil
+import subprocess
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
 from pathlib import Path
+from _video_io import list_videos
+
+try:
+    import decord # Optional: batched decode of only the sampled frames, used when the ffmpeg CLI is missing
+except ImportError:
+    decord = None
+
+# Frames waiting for a writer thread; bounds memory when the disk is slower than decode
+WRITE_QUEUE_SIZE = 32
+
+# Frames decord decodes per get_batch call; bounds memory (8 x 4K RGB is ~200 MB)
+DECORD_BATCH_SIZE = 8
 
 class FrameExtractor:
-    def __init__(self, source_path, output_dir, output_format="jpg", every_n=1, dry_run=False):
+    def __init__(self, source_path, output_dir, output_format="jpg", every_n=1, dry_run=False, keyframes_only=False, workers=None, max_side=0, device="cpu", threads=None):
         """
         Initialize the FrameExtractor.
         
@@ -15,15 +32,23 @@ class FrameExtractor:
             output_format (str): Image format (e.g., 'jpg', 'png').
             every_n (int): Extract every Nth frame.
             dry_run (bool): If True, simulate actions without writing files.
+            keyframes_only (bool): If True, only decode keyframes and keep those at least
+                                   every_n frames apart (much faster, approximate spacing).
+            workers (int): Videos extracted in parallel in batch mode (default: min(8, CPU count)).
+            max_side (int): If > 0, frames are downscaled so their longer side is at most this (never upscaled).
+            device (str): "cpu", or "cuda" to decode on the GPU (NVDEC) where the decoder supports it.
+            threads (int): CPU threads for decoding and encoding, split across workers (default: CPU count).
         """
         self.source_path = str(source_path)
         self.output_dir = str(output_dir)
         self.output_format = output_format.lstrip('.')
         self.every_n = max(1, int(every_n))
         self.dry_run = dry_run
-        
-        # Supported video extensions
-        self.video_extensions = ['*.mp4', '*.avi', '*.mov', '*.mkv', '*.flv', '*.wmv']
+        self.keyframes_only = keyframes_only
+        self.workers = max(1, int(workers)) if workers else min(8, os.cpu_count() or 1)
+        self.max_side = max(0, int(max_side or 0))
+        self.device = device
+        self.threads = max(1, int(threads)) if threads else (os.cpu_count() or 1)
 
     def _get_video_files(self):
         """Resolves source_path to a list of video files."""
@@ -31,13 +56,7 @@ class FrameExtractor:
             return [self.source_path]
         
         elif os.path.isdir(self.source_path):
-            videos = []
-            for ext in self.video_extensions:
-                # Case insensitive search would be better, but glob is case-sensitive on Linux/Mac usually.
-                # We'll just checks lower and upper for now to be safe, similar to other scripts.
-                videos.extend(glob(os.path.join(self.source_path, ext)))
-                videos.extend(glob(os.path.join(self.source_path, ext.upper())))
-            return sorted(list(set(videos))) # Sort and unique
+            return list_videos(self.source_path)
         else:
             print(f"Error: Input path does not exist: {self.source_path}")
             return []
@@ -57,8 +76,284 @@ class FrameExtractor:
         print(f"Processing: {os.path.basename(video_path)} -> {destination_dir}")
         if self.every_n > 1:
             print(f"  Strategy: Extracting every {self.every_n}th frame.")
-        
-        cap = cv2.VideoCapture(video_path)
+
+        if self.keyframes_only and not shutil.which("ffmpeg"):
+            print("  Keyframe-only extraction needs ffmpeg; extracting every Nth frame instead.")
+
+        if self.dry_run:
+            # Only the frame count is needed; ffprobe reads it from the container
+            # without starting a decoder
+            total_frames = self._probe_frames(video_path)
+            if total_frames is not None:
+                print(f"  Total Frames detected: {total_frames}")
+                selected = range(0, total_frames, self.every_n)
+                for frame_idx in selected[:3]: # First few only, to minimize noise
+                    output_path = os.path.join(destination_dir, f"frame_{frame_idx:06d}.{self.output_format}")
+                    print(f"  [PREDICTION] Would write: {output_path}")
+                print(f"  Extracted {len(selected)} frames.")
+                return
+        else:
+            saved_count = None
+            attempted = False
+            if shutil.which("ffmpeg"):
+                attempted = True
+                if self.keyframes_only:
+                    saved_count = self._extract_keyframes(video_path, destination_dir)
+                if saved_count is None:
+                    saved_count = self._extract_with_ffmpeg(video_path, destination_dir)
+            if saved_count is None and decord is not None:
+                attempted = True
+                saved_count = self._extract_with_decord(video_path, destination_dir)
+            if saved_count is not None:
+                print(f"  Extracted {saved_count} frames.")
+                return
+            if attempted:
+                print("  Falling back to OpenCV extraction.")
+
+        self._extract_with_opencv(video_path, destination_dir)
+
+    def _extract_with_ffmpeg(self, video_path, destination_dir):
+        """
+        Lets ffmpeg's select filter drop the unwanted frames, so only kept frames are
+        converted and encoded, and the per-frame work stays out of Python.
+        Returns the number of frames written, or None if ffmpeg failed.
+        """
+        # ffmpeg numbers its output sequentially; frames are renamed to their source
+        # frame index afterwards so both extraction paths produce the same names
+        tmp_prefix = ".ffmpeg_frame_"
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+               *self._ffmpeg_hwaccel_args(), "-threads", str(self.threads), "-i", video_path]
+        filters = []
+        if self.every_n > 1:
+            filters.append(f"select=not(mod(n\\,{self.every_n}))")
+        if self.max_side:
+            filters.append(self._scale_filter())
+        if filters:
+            cmd += ["-vf", ",".join(filters)]
+        # Always: the image2 muxer's default CFR mode duplicates or drops frames of variable
+        # frame rate input (vfr may still drop equal timestamps), and the renaming below
+        # relies on exactly one file per selected frame
+        cmd += ["-vsync", "passthrough", "-threads", str(self.threads), "-q:v", "2", "-start_number", "0",
+                os.path.join(destination_dir, f"{tmp_prefix}%06d.{self.output_format}")]
+
+        result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True)
+
+        with os.scandir(destination_dir) as entries:
+            written = sorted(e.name for e in entries if e.name.startswith(tmp_prefix))
+
+        if result.returncode != 0:
+            print(f"  ffmpeg failed ({result.returncode}): {result.stderr.strip()}")
+            for name in written:
+                os.remove(os.path.join(destination_dir, name))
+            return None
+
+        for kept_index, name in enumerate(written):
+            frame_index = kept_index * self.every_n
+            os.replace(os.path.join(destination_dir, name),
+                       os.path.join(destination_dir, f"frame_{frame_index:06d}.{self.output_format}"))
+        return len(written)
+
+    @staticmethod
+    def _ffprobe_stream(video_path, entries, *options):
+        """
+        The first video stream's `entries` (e.g. ["nb_frames"]) via ffprobe, as a dict of strings.
+        Returns None if ffprobe is missing or fails.
+        """
+        if not shutil.which("ffprobe"):
+            return None
+        cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", *options,
+               "-show_entries", "stream=" + ",".join(entries), "-of", "default=noprint_wrappers=1", video_path]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        return dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+
+    @classmethod
+    def _probe_frames(cls, video_path):
+        """
+        Frame count of the first video stream via ffprobe. Uses the container header
+        when it records one, otherwise counts packets (demux only, no decoding).
+        Returns None if ffprobe is missing or can't tell.
+        """
+        for entry, options in (("nb_frames", ()), ("nb_read_packets", ("-count_packets",))):
+            info = cls._ffprobe_stream(video_path, [entry], *options)
+            if info is None:
+                return None
+            value = info.get(entry, "").strip()
+            if value.isdigit():
+                return int(value)
+        return None
+
+    @classmethod
+    def _probe_frame_rate(cls, video_path):
+        """
+        (fps, start_time, constant) of the first video stream via ffprobe. constant is False
+        when the average rate differs from the base rate, i.e. the video is variable frame rate.
+        Returns None if ffprobe is missing or reports no usable rate.
+        """
+        info = cls._ffprobe_stream(video_path, ["r_frame_rate", "avg_frame_rate", "start_time"])
+        if info is None:
+            return None
+        try:
+            base_rate = Fraction(info.get("r_frame_rate", ""))
+            avg_rate = Fraction(info.get("avg_frame_rate", ""))
+        except (ValueError, ZeroDivisionError):
+            return None # "0/0" when the container doesn't say
+        if base_rate <= 0:
+            return None
+        try:
+            start_time = float(info.get("start_time", ""))
+        except ValueError:
+            start_time = 0.0 # "N/A"
+        return float(base_rate), start_time, avg_rate == base_rate
+
+    def _ffmpeg_hwaccel_args(self):
+        """
+        Input options decoding on NVDEC for device "cuda". Frames come back to system memory
+        for the (CPU) select/scale filters, which only handle the kept frames anyway.
+        """
+        return ["-hwaccel", "cuda"] if self.device == "cuda" else []
+
+    def _scale_filter(self):
+        """ffmpeg filter shrinking the longer side to max_side (area filter, aspect kept, never upscales)."""
+        m = self.max_side
+        return (f"scale=w=if(gte(iw\\,ih)\\,min(iw\\,{m})\\,-2)"
+                f":h=if(gte(iw\\,ih)\\,-2\\,min(ih\\,{m})):flags=area")
+
+    def _extract_keyframes(self, video_path, destination_dir):
+        """
+        Decodes keyframes only (-skip_frame nokey), skipping every P/B frame, and keeps
+        those at least every_n frames after the previously kept one. With GOPs shorter than
+        every_n this is close to every Nth frame at a fraction of the decode cost.
+        ffmpeg logs each kept frame's timestamp (showinfo) and the files are renamed to the
+        frame number it maps to at the stream's frame rate, like the other paths.
+        Returns the number of frames written, or None if the frame rate is unknown or
+        variable (timestamps don't map to frame numbers) or ffmpeg failed.
+        """
+        rate = self._probe_frame_rate(video_path)
+        if rate is None:
+            print("  Keyframe-only extraction needs the frame rate from ffprobe; extracting every Nth frame instead.")
+            return None
+        fps, start_time, constant = rate
+        if not constant:
+            print("  Variable frame rate video; extracting every Nth frame instead of keyframes.")
+            return None
+
+        tmp_prefix = ".ffmpeg_keyframe_"
+        # -copyts keeps the stream's own timestamps, so start_time maps them back to frame 0.
+        # Info level is needed for showinfo; the rest of that output is ignored.
+        cmd = ["ffmpeg", "-hide_banner", "-nostats", "-loglevel", "info", "-nostdin", "-y",
+               *self._ffmpeg_hwaccel_args(), "-threads", str(self.threads),
+               "-skip_frame", "nokey", "-copyts", "-i", video_path]
+        filters = []
+        if self.every_n > 1:
+            min_gap_s = self.every_n / fps
+            filters.append(f"select=isnan(prev_selected_t)+gte(t-prev_selected_t\\,{min_gap_s:.6f})")
+        filters.append("showinfo")
+        if self.max_side:
+            filters.append(self._scale_filter())
+        cmd += ["-vf", ",".join(filters), "-vsync", "vfr", "-threads", str(self.threads),
+                "-q:v", "2", "-start_number", "0",
+                os.path.join(destination_dir, f"{tmp_prefix}%06d.{self.output_format}")]
+
+        result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True)
+        with os.scandir(destination_dir) as entries:
+            written = sorted(e.name for e in entries if e.name.startswith(tmp_prefix))
+        # One showinfo line per frame that reached the encoder, in output order
+        pts_times = re.findall(r"\bpts_time:\s*(-?[\d.]+)", result.stderr)
+
+        if result.returncode != 0 or len(pts_times) != len(written):
+            if result.returncode != 0:
+                errors = [line for line in result.stderr.splitlines() if "pts_time:" not in line]
+                print(f"  ffmpeg failed ({result.returncode}): {' '.join(errors[-3:]).strip()}")
+            else:
+                print(f"  ffmpeg wrote {len(written)} keyframes but reported {len(pts_times)} timestamps.")
+            for name in written:
+                os.remove(os.path.join(destination_dir, name))
+            return None
+
+        for name, pts_time in zip(written, pts_times):
+            frame_index = max(0, round((float(pts_time) - start_time) * fps))
+            os.replace(os.path.join(destination_dir, name),
+                       os.path.join(destination_dir, f"frame_{frame_index:06d}.{self.output_format}"))
+        return len(written)
+
+    def _extract_with_decord(self, video_path, destination_dir):
+        """
+        Decodes only the sampled frame indices with decord, a batch at a time in decode order,
+        and hands them to the writer threads.
+        Returns the number of frames written, or None if decord could not read the video.
+        """
+        import cv2
+        try:
+            ctx = decord.gpu(0) if self.device == "cuda" else decord.cpu(0)
+            # On the GPU only the sampled frames are copied back by asnumpy()
+            reader = decord.VideoReader(video_path, ctx=ctx, num_threads=self.threads)
+        except Exception as e:
+            print(f"  decord could not open the video: {e}")
+            return None
+
+        indices = list(range(0, len(reader), self.every_n))
+        write_queue, writers, write_errors = self._start_writers()
+        saved_count = 0
+        try:
+            for start in range(0, len(indices), DECORD_BATCH_SIZE):
+                if write_errors:
+                    break # Writers are failing; _stop_writers raises the error
+                batch_indices = indices[start:start + DECORD_BATCH_SIZE]
+                batch = reader.get_batch(batch_indices).asnumpy()
+                for frame_index, frame_rgb in zip(batch_indices, batch):
+                    output_path = os.path.join(destination_dir, f"frame_{frame_index:06d}.{self.output_format}")
+                    # decord yields RGB; cvtColor also gives the writer its own array
+                    write_queue.put((output_path, cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR), frame_index))
+                    saved_count += 1
+        except Exception as e:
+            print(f"  decord failed after {saved_count} frames: {e}")
+            return None
+        finally:
+            self._stop_writers(write_queue, writers, write_errors)
+        return saved_count
+
+    def _start_writers(self):
+        """
+        Starts the frame writer threads. Returns (write_queue, writers, write_errors) for
+        _stop_writers; write_errors receives the first exception any writer hits.
+        """
+        # Encoding + writing dominates extraction; cv2 releases the GIL while encoding,
+        # so writer threads let decode continue in parallel
+        write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        write_errors = []
+        writers = []
+        for _ in range(max(1, self.threads // 2)):
+            writer = threading.Thread(target=self._write_frames, args=(write_queue, write_errors), daemon=True)
+            writer.start()
+            writers.append(writer)
+        return write_queue, writers, write_errors
+
+    @staticmethod
+    def _stop_writers(write_queue, writers, write_errors):
+        """Lets the writer threads drain the queue, waits for them, then raises the first write error."""
+        for _ in writers:
+            write_queue.put(None)
+        for writer in writers:
+            writer.join()
+        if write_errors:
+            raise write_errors[0]
+
+    def _extract_with_opencv(self, video_path, destination_dir):
+        """Decodes every frame with OpenCV and writes the selected ones. Used without ffmpeg and for dry runs ffprobe can't answer."""
+        import cv2
+        # FFmpeg backend options, read on every open: let FFmpeg choose its (frame/slice)
+        # decode thread count and regenerate missing timestamps. setdefault keeps user overrides.
+        os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", "threads;0|fflags;+genpts")
+        # The writer threads already encode in parallel; cap OpenCV's own pool to avoid oversubscription
+        cv2.setNumThreads(max(1, self.threads // 2))
+        if self.device == "cuda":
+            # Any hardware decoder this OpenCV build supports; silently software otherwise
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        else:
+            cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             print(f"Error: Could not open video {video_path}")
             return
@@ -68,10 +363,15 @@ class FrameExtractor:
 
         frame_count = 0
         saved_count = 0
+
+        write_queue, writers, write_errors = self._start_writers() if not self.dry_run else (None, [], [])
         
+        # Retrieved into the same array every time; only kept frames are copied out
+        frame = None
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            # grab() only advances the decoder; skipped frames never pay for the
+            # colour conversion and copy that retrieve() does
+            if not cap.grab():
                 break
             
             # Selection Strategy
@@ -84,16 +384,72 @@ class FrameExtractor:
                     if saved_count < 3:
                         print(f"  [PREDICTION] Would write: {output_path}")
                 else:
-                    success = cv2.imwrite(output_path, frame)
-                    if not success:
-                        print(f"  Error writing frame {frame_count}")
+                    if write_errors:
+                        break # Writers are failing; _stop_writers raises the error
+                    ret, frame = cap.retrieve(frame)
+                    if not ret:
+                        break
+                    write_queue.put((output_path, frame.copy(), frame_count))
                 saved_count += 1
             
             frame_count += 1
 
         cap.release()
+        if writers:
+            self._stop_writers(write_queue, writers, write_errors)
         print(f"  Extracted {saved_count} frames.")
 
+    def _write_frames(self, write_queue, write_errors):
+        """
+        Writer thread: encodes and writes queued frames until it receives None.
+        A failing frame is recorded in write_errors (first error only) and the thread keeps
+        taking items, so the decode loop and the stop sentinels never block on a full queue.
+        """
+        import cv2
+        extension = "." + self.output_format
+        # Built once per writer instead of per frame. JPEG keeps OpenCV's default quality (95);
+        # PNG drops from zlib level 3 to 1, about half the encode CPU for ~20% larger (still lossless) files
+        fmt = self.output_format.lower()
+        if fmt in ("jpg", "jpeg"):
+            encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), 95]
+        elif fmt == "png":
+            encode_params = [int(cv2.IMWRITE_PNG_COMPRESSION), 1]
+        else:
+            encode_params = []
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            if write_errors:
+                continue # Already failed; just drain
+            output_path, frame, frame_count = item
+            try:
+                self._write_frame(output_path, frame, extension, encode_params)
+            except Exception as e:
+                print(f"  Error writing frame {frame_count}: {e}")
+                write_errors.append(e)
+
+    def _write_frame(self, output_path, frame, extension, encode_params):
+        """Resizes (max_side), encodes and writes one frame. Raises on any failure."""
+        import cv2
+        if self.max_side:
+            # Resized here rather than in the decode loop; cv2.resize releases the GIL
+            h, w = frame.shape[:2]
+            scale = self.max_side / float(max(h, w))
+            if scale < 1.0:
+                frame = cv2.resize(frame, (max(1, round(w * scale)), max(1, round(h * scale))),
+                                   interpolation=cv2.INTER_AREA)
+        # Encoding to memory and writing once avoids imwrite's many small writes
+        success, encoded = cv2.imencode(extension, frame, encode_params)
+        if not success:
+            raise RuntimeError(f"could not encode as {extension}")
+        # Unbuffered writes straight from the encoder's array: no bytes() copy and
+        # no pass through a Python-side buffer. Raw writes may be partial, hence the loop.
+        view = memoryview(encoded).cast("B")
+        with open(output_path, "wb", buffering=0) as f:
+            while view:
+                view = view[f.write(view):]
+
     def run(self):
         print(f"--- Starting Frame Extraction ---")
         print(f"Input: {self.source_path}")
@@ -109,36 +465,59 @@ class FrameExtractor:
 
         is_batch_mode = len(video_files) > 1 or os.path.isdir(self.source_path)
 
+        target_dirs = []
         for video_path in video_files:
             # Determine specific output directory
             if is_batch_mode:
                 # Batch mode: create subdirectory named after the video file
                 video_name = os.path.splitext(os.path.basename(video_path))[0]
-                target_dir = os.path.join(self.output_dir, video_name)
+                target_dirs.append(os.path.join(self.output_dir, video_name))
             else:
                 # Single file mode: output directly to requested dir
-                target_dir = self.output_dir
-            
-            self._extract_from_video(video_path, target_dir)
+                target_dirs.append(self.output_dir)
+
+        workers = min(self.workers, len(video_files))
+        if workers > 1:
+            # Videos are independent; processes sidestep the GIL around decode and encode.
+            # Each gets its share of the thread budget (self is pickled into the workers).
+            self.threads = max(1, self.threads // workers)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self._extract_from_video, video_files, target_dirs))
+        else:
+            for video_path, target_dir in zip(video_files, target_dirs):
+                self._extract_from_video(video_path, target_dir)
 
         print("-" * 30)
         print("Extraction pipeline complete.")
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Video Frame Extraction Script")
     parser.add_argument("--input_dir", required=True, help="Path to video file OR directory containing videos")
     parser.add_argument("--output_dir", required=True, help="Directory to save extracted frames")
     parser.add_argument("--format", type=str, default="jpg", help="Output image format (jpg, png, bmp, etc.)")
     parser.add_argument("--every_n", type=int, default=1, help="Extract every Nth frame (default: 1)")
     parser.add_argument("--dry_run", action="store_true", help="Simulate without writing files")
+    parser.add_argument("--workers", type=int, default=None, help="Videos extracted in parallel in batch mode (default: min(8, CPU count))")
+    parser.add_argument("--max_side", type=int, default=0, help="Downscale frames so the longer side is at most this many pixels (0 = full resolution)")
+    parser.add_argument("--device", choices=["cpu", "cuda"], default="cpu", help="Decode on the CPU or the GPU (NVDEC)")
+    parser.add_argument("--keyframes_only", action="store_true", help="Only decode keyframes, at least every_n frames apart (needs ffmpeg and ffprobe; variable frame rate videos extract every Nth frame)")
+    parser.add_argument("--threads", type=int, default=None, help="CPU threads for decoding and encoding, split across --workers (default: CPU count)")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     extractor = FrameExtractor(
         source_path=args.input_dir,
         output_dir=args.output_dir,
         output_format=args.format,
         every_n=args.every_n,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        keyframes_only=args.keyframes_only,
+        workers=args.workers,
+        max_side=args.max_side,
+        device=args.device,
+        threads=args.threads
     )
     extractor.run()
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,33 @@
 from abc import ABC, abstractmethod
 import tkinter as tk
-from typing import List, Any, Dict, Optional
+from typing import List, Any, Dict, Optional, Tuple
 from core.state_models import PipelineConfiguration
 
+# Widget edits are written to the config once typing pauses for this long
+COMMIT_DELAY_MS = 200
+
 class PipelineSection(ABC):
     """
     Abstract Base Class for a single step in the pipeline.
     Enforces the interface for Rendering Options and Building Commands.
     """
+    # Set to True (and override `shard`) if the step's input splits into independent
+    # pieces that can run as parallel processes.
+    shardable: bool = False
+
+    # Options form as data, drawn by the default render_options. DESCRIPTION is the grey
+    # line on top; each WIDGETS entry is (helper, *args), e.g. ("checkbox", "Dry Run", "dry_run", False)
+    # calls self._add_checkbox(parent, "Dry Run", "dry_run", False).
+    DESCRIPTION: str = ""
+    WIDGETS: Tuple[Tuple[Any, ...], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Resolve the helpers once per class; a misspelled helper fails at import, not on first render
+        cls._widget_builders = tuple(
+            (getattr(cls, "_add_" + helper), args) for helper, *args in cls.WIDGETS
+        )
+
     def __init__(self, name: str, config: PipelineConfiguration):
         self.name = name
         self.config = config
@@ -20,13 +40,23 @@ class PipelineSection(ABC):
         self.input_path: str = ""
         self.output_path: str = ""
 
-    @abstractmethod
+        # This section's settings dict, looked up once for all widgets (see _section_config)
+        self._section_cfg: Optional[Dict[str, Any]] = None
+
+        # Widget values not yet written to the config (see _bind_var / commit_pending)
+        self._pending: Dict[str, Any] = {}
+        self._commit_widget: Optional[tk.Widget] = None
+        self._commit_after_id: Optional[str] = None
+
     def render_options(self, parent: tk.Frame):
         """
         Draw the configuration widgets for this section into `parent`.
-        Should verify if config keys exist, if not, set defaults.
+        The default draws DESCRIPTION and WIDGETS; override for layouts the helpers can't express.
         """
-        pass
+        if self.DESCRIPTION:
+            self._add_description(parent, self.DESCRIPTION)
+        for build, args in self._widget_builders:
+            build(self, parent, *args)
 
     def set_paths(self, input_path: str, output_path: str):
         """Called by PipelineManager to inject chained paths."""
@@ -47,6 +77,44 @@ class PipelineSection(ABC):
         """
         pass
 
+    def shard(self, input_path: str, output_path: str) -> List[Tuple[str, str]]:
+        """
+        Splits one run into independent (input, output) pieces.
+        The default is a single piece, i.e. no sharding.
+        """
+        return [(input_path, output_path)]
+
+    def build_shard_commands(self, shards: List[Tuple[str, str]], threads: int = 0) -> List[List[str]]:
+        """
+        Builds one command per shard. threads, if set, is each shard's CPU budget, passed
+        as the "threads" setting. The section's own paths and settings are restored afterwards.
+        """
+        input_path, output_path = self.input_path, self.output_path
+        section_cfg = self._section_config()
+        saved_threads = section_cfg.pop("threads", None)
+        if threads:
+            section_cfg["threads"] = threads
+        try:
+            commands = []
+            for shard_input, shard_output in shards:
+                self.set_paths(shard_input, shard_output)
+                commands.append(self.build_command())
+        finally:
+            section_cfg.pop("threads", None)
+            if saved_threads is not None:
+                section_cfg["threads"] = saved_threads
+            self.set_paths(input_path, output_path)
+        return commands
+
+    def commit_pending(self):
+        """
+        Writes widget edits still waiting out the debounce into the config.
+        Called before the section is validated and run. Makes no Tk calls, so any thread may call it.
+        """
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            self._section_config().update(pending)
+
     def validate(self) -> bool:
         """
         Override this to check if necessary inputs exist (files, paths)
@@ -59,7 +127,40 @@ class PipelineSection(ABC):
         pass
 
     # --- Helper methods for Widgets ---
+
+    def _section_config(self) -> Dict[str, Any]:
+        """
+        The live settings dict for this section, fetched once and shared by every widget
+        helper and trace callback. The config keeps the same dict object per section.
+        """
+        if self._section_cfg is None:
+            self._section_cfg = self.config.get_section_config(self.name)
+        return self._section_cfg
+
+    def _bind_var(self, widget: tk.Widget, config_key: str, var: tk.Variable):
+        """
+        Registers var and writes its value into the section config once edits pause
+        for COMMIT_DELAY_MS, so typing a path is one config write instead of one per keystroke.
+        """
+        self.widget_vars[config_key] = var
+
+        def write(*args):
+            self._pending[config_key] = var.get()
+            if self._commit_after_id is not None:
+                self._commit_widget.after_cancel(self._commit_after_id)
+            self._commit_widget = widget
+            self._commit_after_id = widget.after(COMMIT_DELAY_MS, self._on_commit_timer)
+
+        var.trace_add("write", write)
+
+    def _on_commit_timer(self):
+        self._commit_after_id = None
+        self.commit_pending()
     
+    def _add_description(self, parent: tk.Frame, text: str):
+        """Helper to create the greyed-out description line at the top of the options."""
+        tk.Label(parent, text=text, fg="gray").pack(pady=5)
+
     def _add_entry(self, parent: tk.Frame, label_text: str, config_key: str, default_val: str = ""):
         """Helper to create a Label + Entry row."""
         frame = tk.Frame(parent)
@@ -69,13 +170,12 @@ class PipelineSection(ABC):
         lbl.pack(side='left', padx=5)
         
         # Load current value from config or default
-        current_val = self.config.get_section_config(self.name).get(config_key, default_val)
+        current_val = self._section_config().get(config_key, default_val)
         
         var = tk.StringVar(value=str(current_val))
-        self.widget_vars[config_key] = var
         
         # Trace changes to update config immediately
-        var.trace_add("write", lambda *args: self.config.update_section_config(self.name, config_key, var.get()))
+        self._bind_var(frame, config_key, var)
         
         entry = tk.Entry(frame, textvariable=var)
         entry.pack(side='left', fill='x', expand=True, padx=5)
@@ -85,11 +185,9 @@ class PipelineSection(ABC):
         frame = tk.Frame(parent)
         frame.pack(fill='x', pady=2)
         
-        current_val = self.config.get_section_config(self.name).get(config_key, default_val)
+        current_val = self._section_config().get(config_key, default_val)
         var = tk.BooleanVar(value=current_val)
-        self.widget_vars[config_key] = var
-        
-        var.trace_add("write", lambda *args: self.config.update_section_config(self.name, config_key, var.get()))
+        self._bind_var(frame, config_key, var)
         
         chk = tk.Checkbutton(frame, text=label_text, variable=var)
         chk.pack(side='left', padx=25) # Offset to align somewhat with entries
@@ -102,14 +200,15 @@ class PipelineSection(ABC):
         lbl = tk.Label(frame, text=label_text, width=20, anchor='e')
         lbl.pack(side='left', padx=5)
         
-        current_val = self.config.get_section_config(self.name).get(config_key, default_val)
+        # Tk hands the selection back as a string, so compare as strings: int options
+        # (e.g. resolutions) must still match a value saved from a previous edit
+        options = [str(option) for option in options]
+        current_val = str(self._section_config().get(config_key, default_val))
         if current_val not in options and options:
              current_val = options[0]
 
         var = tk.StringVar(value=current_val)
-        self.widget_vars[config_key] = var
-        
-        var.trace_add("write", lambda *args: self.config.update_section_config(self.name, config_key, var.get()))
+        self._bind_var(frame, config_key, var)
         
         menu = tk.OptionMenu(frame, var, *options)
         
@@ -128,7 +227,7 @@ class PipelineSection(ABC):
         lbl = tk.Label(frame, text=label_text, width=20, anchor='e')
         lbl.pack(side='left', padx=5)
         
-        current_val = self.config.get_section_config(self.name).get(config_key, default_val)
+        current_val = self._section_config().get(config_key, default_val)
         
         # Ensure value is float for consistency
         try:
@@ -137,9 +236,7 @@ class PipelineSection(ABC):
             current_val = float(default_val)
 
         var = tk.DoubleVar(value=current_val)
-        self.widget_vars[config_key] = var
-        
-        var.trace_add("write", lambda *args: self.config.update_section_config(self.name, config_key, var.get()))
+        self._bind_var(frame, config_key, var)
         
         # width=10 is approx half of a typical entry that expands
         sb = tk.Spinbox(frame, from_=min_val, to=max_val, increment=step,
@@ -155,16 +252,14 @@ class PipelineSection(ABC):
         lbl = tk.Label(frame, text=label_text, width=20, anchor='e')
         lbl.pack(side='left', padx=5)
         
-        current_val = self.config.get_section_config(self.name).get(config_key, default_val)
+        current_val = self._section_config().get(config_key, default_val)
         try:
             current_val = int(float(current_val))
         except (ValueError, TypeError):
             current_val = int(default_val)
 
         var = tk.IntVar(value=current_val)
-        self.widget_vars[config_key] = var
-        
-        var.trace_add("write", lambda *args: self.config.update_section_config(self.name, config_key, var.get()))
+        self._bind_var(frame, config_key, var)
         
         sb = tk.Spinbox(frame, from_=min_val, to=max_val, increment=step,
                         textvariable=var, width=10)
@@ -1,30 +1,46 @@
-from typing import List
+from typing import List, Tuple
 import tkinter as tk
 import sys
 import os
 from .base_section import PipelineSection
+from scripts._image_io import image_directories
 
 class BlurSection(PipelineSection):
     """
     A specific implementation of a pipeline step.
     Groups frames and removes % of blurry frames from group
     """
+    # Every image directory is filtered independently by the script
+    shardable = True
+
+    DESCRIPTION = "This is a dummy section for verification."
+    WIDGETS = (
+        ("int_spinbox", "Target Count (0=Auto):", "target_count", 0, 10000, 1, 0),
+        ("float_spinbox", "Keep %(0-1):", "target_percentage", 0.00, 1.00, 0.01, 0.95),
+        ("int_spinbox", "Groups", "groups", 0, 10000, 1, 10), # max/default groups is arbitrary
+        ("checkbox", "Dry Run (Simulate)", "dry_run", False),
+    )
+
     def __init__(self, name: str, config):
         super().__init__(name, config)
         
-    def render_options(self, parent: tk.Frame):
-        # Section title or description
-        tk.Label(parent, text="This is a dummy section for verification.", fg="gray").pack(pady=5)
-        
-        # Add some configurable inputs
-        self._add_int_spinbox(parent, "Target Count (0=Auto):", "target_count", 0, 10000, 1, 0)
-        self._add_float_spinbox(parent, "Keep %(0-1):", "target_percentage", 0.00, 1.00, 0.01, 0.95)
-        self._add_int_spinbox(parent, "Groups", "groups", 0, 10000, 1, 10) # max/default groups is arbitrary
+    def shard(self, input_path: str, output_path: str) -> List[Tuple[str, str]]:
+        """
+        One shard per top-most directory containing images. The script handles an
+        image directory's sub-directories itself, so those are not split out again.
+        """
+        if not os.path.isdir(input_path):
+            return [(input_path, output_path)]
 
-        self._add_checkbox(parent, "Dry Run (Simulate)", "dry_run", default_val=False)
+        shards = [
+            (root, os.path.normpath(os.path.join(output_path, os.path.relpath(root, input_path))))
+            for root in image_directories(input_path, topmost=True)
+        ]
+        return shards or [(input_path, output_path)]
 
     def build_command(self) -> List[str]:
         # Delegate command building to the specialized builder
         # ensuring we pass the section config (which includes the injected paths)
         from core.command_builders import BlurCommandBuilder
-        return BlurCommandBuilder.build(self.config.get_section_config(self.name))
+        from core.state_models import BlurConfig
+        return BlurCommandBuilder.build(BlurConfig.from_dict(self.config.get_section_config(self.name)))
@@ -8,19 +8,17 @@ class ExampleSection(PipelineSection):
     A specific implementation of a pipeline step.
     Simulates a time-consuming task.
     """
+    DESCRIPTION = "This is a dummy section for verification."
+    WIDGETS = (
+        ("entry", "Sleep Duration (s):", "duration", "2"),
+        ("entry", "Echo Message:", "message", "Hello World"),
+        ("checkbox", "Force Error?", "should_fail", False),
+        ("float_spinbox", "Float Test:", "test_float", 0.0, 10.0, 0.5, 5.0),
+    )
+
     def __init__(self, name: str, config):
         super().__init__(name, config)
         
-    def render_options(self, parent: tk.Frame):
-        # Section title or description
-        tk.Label(parent, text="This is a dummy section for verification.", fg="gray").pack(pady=5)
-        
-        # Add some configurable inputs
-        self._add_entry(parent, "Sleep Duration (s):", "duration", default_val="2")
-        self._add_entry(parent, "Echo Message:", "message", default_val="Hello World")
-        self._add_checkbox(parent, "Force Error?", "should_fail", default_val=False)
-        self._add_float_spinbox(parent, "Float Test:", "test_float", 0.0, 10.0, 0.5, 5.0)
-
     def build_command(self) -> List[str]:
         # Read values from config
         cfg = self.config.get_section_config(self.name)
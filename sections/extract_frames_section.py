@@ -1,27 +1,48 @@
-from typing import List
+from typing import List, Tuple
 import tkinter as tk
 import sys
 import os
 from .base_section import PipelineSection
+from scripts._video_io import list_videos
 
 class ExtractFramesSection(PipelineSection):
     """
     A specific implementation of a pipeline step.
     Extracts frames from video files.
     """
+    # Every video in a directory is extracted independently by the script
+    shardable = True
+
+    DESCRIPTION = "Extract frames from video files."
+    WIDGETS = (
+        ("dropdown", "Output Format", "format", ["jpg", "png"], "jpg"),
+        ("int_spinbox", "Extract Every Nth Frame", "every_n", 1, 1000, 1, 1),
+        ("int_spinbox", "Max Image Side (0 = Full Resolution)", "max_side", 0, 8192, 64, 0),
+        ("dropdown", "Decode Device", "device", ["cpu", "cuda"], "cpu"),
+        ("checkbox", "Keyframes Only (Fast, Approximate)", "keyframes_only", False),
+        ("checkbox", "Dry Run (Simulate)", "dry_run", False),
+    )
+
     def __init__(self, name: str, config):
         super().__init__(name, config)
         
-    def render_options(self, parent: tk.Frame):
-        # Section title or description
-        tk.Label(parent, text="Extract frames from video files.", fg="gray").pack(pady=5)
-        
-        # Add some configurable inputs
-        self._add_dropdown(parent, "Output Format", "format", ["jpg", "png"], default_val="jpg")
-        self._add_int_spinbox(parent, "Extract Every Nth Frame", "every_n", 1, 1000, 1, 1)
-        self._add_checkbox(parent, "Dry Run (Simulate)", "dry_run", default_val=False)
+    def shard(self, input_path: str, output_path: str) -> List[Tuple[str, str]]:
+        """
+        One shard per video in a directory. Each writes to <output>/<video name>,
+        the same layout the script's batch mode produces.
+        """
+        if not os.path.isdir(input_path):
+            return [(input_path, output_path)]
+
+        # Same listing the script's batch mode uses, so both agree on which files are videos
+        shards = [
+            (video_path, os.path.join(output_path, os.path.splitext(os.path.basename(video_path))[0]))
+            for video_path in list_videos(input_path)
+        ]
+        return shards or [(input_path, output_path)]
 
     def build_command(self) -> List[str]:
         # Delegate command building to the specialized builder
         from core.command_builders import ExtractFramesCommandBuilder
-        return ExtractFramesCommandBuilder.build(self.config.get_section_config(self.name))
+        from core.state_models import ExtractConfig
+        return ExtractFramesCommandBuilder.build(ExtractConfig.from_dict(self.config.get_section_config(self.name)))
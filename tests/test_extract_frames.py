@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = np = None
+
+
+@unittest.skipIf(cv2 is None, "needs OpenCV and numpy")
+class WriterErrorTest(unittest.TestCase):
+    def _make_video(self, path, frames=80):
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (32, 32))
+        for i in range(frames):
+            writer.write(np.full((32, 32, 3), i % 256, dtype=np.uint8))
+        writer.release()
+
+    def test_bad_format_fails_instead_of_hanging(self):
+        from extract_frames import FrameExtractor, WRITE_QUEUE_SIZE
+
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, "clip.avi")
+            # More frames than the write queue holds, so dead writers would block the decode loop
+            self._make_video(video, frames=WRITE_QUEUE_SIZE * 3)
+            out_dir = os.path.join(tmp, "frames")
+            os.makedirs(out_dir)
+            extractor = FrameExtractor(video, out_dir, output_format="notaformat", threads=4)
+
+            errors = []
+            def extract():
+                try:
+                    extractor._extract_with_opencv(video, out_dir)
+                except Exception as e:
+                    errors.append(e)
+
+            thread = threading.Thread(target=extract, daemon=True)
+            thread.start()
+            thread.join(timeout=60)
+
+            self.assertFalse(thread.is_alive(), "extraction hung after the writers failed")
+            self.assertEqual(len(errors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import queue
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_queue import LogQueue
+
+
+def drain(log_queue):
+    items = []
+    while True:
+        try:
+            items.append(log_queue.get_nowait())
+        except queue.Empty:
+            return items
+
+
+class DroppedLinesTest(unittest.TestCase):
+    def test_overflow_is_reported_in_place_of_the_dropped_lines(self):
+        log_queue = LogQueue(maxlen=3)
+        log_queue.put(["a\n", "b\n"])
+        for text in ("c\n", "d\n", "e\n", "f\n"):
+            log_queue.put(text)
+        # ["a", "b"] and "c" were dropped
+        self.assertEqual(drain(log_queue), ["[3 lines dropped]\n", "d\n", "e\n", "f\n"])
+
+    def test_no_report_without_overflow(self):
+        log_queue = LogQueue(maxlen=3)
+        log_queue.put("a\n")
+        self.assertEqual(drain(log_queue), ["a\n"])
+        log_queue.put("b\n")
+        self.assertEqual(drain(log_queue), ["b\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
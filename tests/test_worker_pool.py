@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_queue import LogQueue
+from core.worker_pool import ScriptWorkerPool
+
+# Each job marks itself started, then waits for all of the batch to have started.
+# Run one after another, the first job would time out and fail.
+_BARRIER_JOB = '''
+import os
+import sys
+import time
+
+def main(argv):
+    marker_dir, count = argv[0], int(argv[1])
+    open(os.path.join(marker_dir, f"{argv[2]}-{os.getpid()}"), "w").close()
+    deadline = time.monotonic() + 30
+    while len(os.listdir(marker_dir)) < count:
+        if time.monotonic() > deadline:
+            sys.exit(3)
+        time.sleep(0.05)
+'''
+
+
+class ShardConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self._tmp.name, "zz_barrier_job.py"), "w") as f:
+            f.write(_BARRIER_JOB)
+        # Spawned workers start with the parent's sys.path
+        sys.path.insert(0, self._tmp.name)
+        self.pool = ScriptWorkerPool(LogQueue())
+
+    def tearDown(self):
+        self.pool.shutdown()
+        sys.path.remove(self._tmp.name)
+        self._tmp.cleanup()
+
+    def _run_batch(self, name, count):
+        marker_dir = os.path.join(self._tmp.name, name)
+        os.mkdir(marker_dir)
+        done = threading.Event()
+        return_codes = []
+
+        def finished(return_code):
+            return_codes.append(return_code)
+            done.set()
+
+        jobs = [{"script": "zz_barrier_job", "argv": [marker_dir, str(count), str(i)]} for i in range(count)]
+        self.pool.submit_many(jobs, finished, max_workers=count)
+        self.assertTrue(done.wait(60), "batch did not finish")
+        self.assertEqual(return_codes, [0])
+        return {marker.rsplit("-", 1)[1] for marker in os.listdir(marker_dir)}
+
+    def test_shards_run_concurrently_on_a_warm_worker(self):
+        # One warm worker already idle, as after a previous single-job step
+        self.pool.start()
+        pids = self._run_batch("first", 4)
+        self.assertEqual(len(pids), 4)
+
+    def test_extra_workers_are_reused(self):
+        first = self._run_batch("first", 3)
+        second = self._run_batch("second", 3)
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()